@@ -5,33 +5,34 @@ Provides REST API endpoints for health checks and membership processing.
 
 import asyncio
 # Import the unified flow for Schmick Club
-from unified_flow import create_schmick_membership
+from unified_flow import create_schmick_membership, get_browser, close_browser, flush_logs
 from contextlib import asynccontextmanager
 from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, HTTPException, Header, Depends, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr, Field, validator
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 
 from logger import get_logger, LoggerAdapter, mask_sensitive_data
 from utils import (
-    load_env, validate_required_env, format_membership_number, 
+    Config, load_env, validate_required_env, format_membership_number, 
     sanitize_record_data, retry_async, StorageStateManager, 
     create_request_context, RetryableError, NonRetryableError
 )
-from website_selectors import selectors, FIELD_MAPPING, TIMEOUTS
+from website_selectors import selectors, as_css, FIELD_SELECTORS, TIMEOUTS
 
 
 # Initialize logger
 logger = get_logger(__name__)
 
-# Global variables for browser management
-playwright_instance: Optional[Playwright] = None
+# Global variables for browser management - the browser is the unified flow's shared instance
 browser: Optional[Browser] = None
 concurrency_semaphore: Optional[asyncio.Semaphore] = None
 storage_manager: Optional[StorageStateManager] = None
-config: Dict[str, Any] = {}
+config: Optional[Config] = None
+
+_new_membership = selectors['new_membership']
 
 
 # Custom exceptions
@@ -130,7 +131,7 @@ def validate_api_key(
     Raises:
         HTTPException: If API key is invalid or missing
     """
-    expected_key = config.get('PLAYWRIGHT_API_KEY')
+    expected_key = config.PLAYWRIGHT_API_KEY if config else None
     if not expected_key:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,36 +158,27 @@ def validate_api_key(
 
 
 async def startup_playwright():
-    """Initialize Playwright browser instance."""
-    global playwright_instance, browser, concurrency_semaphore, storage_manager, config
+    """Initialize the shared Playwright browser instance."""
+    global browser, concurrency_semaphore, storage_manager, config
     
     try:
         config = load_env()
         validate_required_env()
         
         # Initialize storage manager
-        storage_manager = StorageStateManager(config['STORAGE_STATE_FILE'])
-        
-        # Initialize concurrency control
-        concurrency_semaphore = asyncio.Semaphore(config['MAX_CONCURRENCY'])
-        
-        # Launch Playwright with Firefox (works better on macOS)
-        playwright_instance = await async_playwright().start()
-        browser = await playwright_instance.firefox.launch(
-            headless=config['HEADLESS'],
-            slow_mo=1000 if not config['HEADLESS'] else 0,  # Slow down for demo visibility
-            args=[
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
+        storage_manager = StorageStateManager(config.STORAGE_STATE_FILE)
+        
+        # Initialize concurrency control - caps the browser contexts open at once
+        concurrency_semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY)
+        
+        # Launch the browser shared by every request (each request only opens its own context)
+        browser = await get_browser()
         
         logger.info("Playwright browser initialized successfully", extra={
             'event': 'startup',
-            'headless': config['HEADLESS'],
-            'max_concurrency': config['MAX_CONCURRENCY']
+            'browser': browser.browser_type.name,
+            'headless': config.HEADLESS,
+            'max_concurrency': config.MAX_CONCURRENCY
         })
         
     except Exception as e:
@@ -196,16 +188,16 @@ async def startup_playwright():
 
 async def shutdown_playwright():
     """Cleanup Playwright resources."""
-    global playwright_instance, browser
+    global browser
     
     try:
-        if browser:
-            await browser.close()
-            logger.info("Browser closed", extra={'event': 'shutdown'})
+        # Closes the shared browser and stops Playwright
+        await close_browser()
+        browser = None
+        logger.info("Browser closed", extra={'event': 'shutdown'})
         
-        if playwright_instance:
-            await playwright_instance.stop()
-            logger.info("Playwright stopped", extra={'event': 'shutdown'})
+        # Write out any request/validation log entries still queued
+        await flush_logs()
             
     except Exception as e:
         logger.error(f"Error during cleanup: {e}", extra={'event': 'shutdown_error'})
@@ -264,12 +256,12 @@ async def ensure_logged_in(request_logger: LoggerAdapter) -> Dict[str, Any]:
         # Navigate to login page
         login_url = selectors['login']['url']
         request_logger.info_event("navigate", f"Navigating to login page: {login_url}")
-        await page.goto(login_url, timeout=config['TIMEOUT_MS'], wait_until='networkidle')
+        await page.goto(login_url, timeout=config.TIMEOUT_MS, wait_until='domcontentloaded')
         
         # Check for CAPTCHA or 2FA
         try:
-            captcha_selector = selectors['login']['captcha_indicator']
-            two_fa_selector = selectors['login']['two_fa_indicator']
+            captcha_selector = as_css(selectors['login']['captcha_indicator'])
+            two_fa_selector = as_css(selectors['login']['two_fa_indicator'])
             
             if await page.locator(captcha_selector).count() > 0:
                 raise CaptchaDetectedError("CAPTCHA detected on login page")
@@ -288,10 +280,10 @@ async def ensure_logged_in(request_logger: LoggerAdapter) -> Dict[str, Any]:
         
         # Wait for fields to be visible and fill them
         await page.wait_for_selector(username_selector, state="visible", timeout=10000)
-        await page.fill(username_selector, config['SCHMICK_USER'])
+        await page.fill(username_selector, config.SCHMICK_USER)
         
         await page.wait_for_selector(password_selector, state="visible", timeout=10000)
-        await page.fill(password_selector, config['SCHMICK_PASS'])
+        await page.fill(password_selector, config.SCHMICK_PASS)
         
         # Submit login form using the working selector
         submit_selector = "button:has-text('Log in')"  # Working selector from tests
@@ -299,7 +291,7 @@ async def ensure_logged_in(request_logger: LoggerAdapter) -> Dict[str, Any]:
         await page.click(submit_selector)
         
         # Wait for post-login indicator
-        post_login_selector = selectors['login']['post_login_indicator']
+        post_login_selector = as_css(selectors['login']['post_login_indicator'])
         await page.wait_for_selector(
             post_login_selector, 
             timeout=TIMEOUTS['login']
@@ -350,12 +342,12 @@ async def process_record(record: MembershipRecord, request_logger: LoggerAdapter
     
     try:
         # Navigate to membership form
-        form_url = selectors['new_membership']['url']
+        form_url = _new_membership['url']
         request_logger.info_event("navigate", f"Navigating to membership form: {form_url}")
-        await page.goto(form_url, timeout=config['TIMEOUT_MS'], wait_until='networkidle')
+        await page.goto(form_url, timeout=config.TIMEOUT_MS, wait_until='domcontentloaded')
         
         # Wait for form to be ready
-        form_container = selectors['new_membership']['form_container']
+        form_container = as_css(_new_membership['form_container'])
         await page.wait_for_selector(form_container, timeout=TIMEOUTS['element_wait'])
         
         # Fill form fields
@@ -364,17 +356,9 @@ async def process_record(record: MembershipRecord, request_logger: LoggerAdapter
         record_dict = record.dict(exclude_unset=True)
         filled_fields = []
         
-        for field_name, field_value in record_dict.items():
-            if field_name == 'salesforceId' or field_value is None:
-                continue
-                
-            # Map field name to selector key
-            selector_key = FIELD_MAPPING.get(field_name)
-            if not selector_key:
-                continue
-                
-            selector = selectors['new_membership'].get(selector_key)
-            if not selector:
+        for field_name, selector in FIELD_SELECTORS:
+            field_value = record_dict.get(field_name)
+            if field_value is None:
                 continue
             
             try:
@@ -402,7 +386,7 @@ async def process_record(record: MembershipRecord, request_logger: LoggerAdapter
                                 filled_fields=filled_fields)
         
         # Submit form
-        submit_selector = selectors['new_membership']['submit']
+        submit_selector = as_css(_new_membership['submit'])
         request_logger.info_event("submit", "Submitting Fix My Ads form")
         await page.click(submit_selector)
         
@@ -415,25 +399,25 @@ async def process_record(record: MembershipRecord, request_logger: LoggerAdapter
             request_logger.warning_event("redirect_timeout", "No redirect detected, continuing...")
         
         # Navigate to results page to get the ID from table
-        results_url = "https://app.schmickclub.com/memberships/distributors/view-members"
+        results_url = selectors['result']['url']
         request_logger.info_event("navigate_results", f"Navigating to results page: {results_url}")
-        await page.goto(results_url, timeout=config['TIMEOUT_MS'], wait_until='networkidle')
+        await page.goto(results_url, timeout=config.TIMEOUT_MS, wait_until='domcontentloaded')
         
         # Wait for table to load
-        table_selector = selectors['result']['table_container']
+        table_selector = as_css(selectors['result']['table_container'])
         request_logger.info_event("wait_table", "Waiting for results table to load")
         try:
             await page.wait_for_selector(table_selector, timeout=TIMEOUTS['element_wait'])
         except PlaywrightTimeoutError:
             # Check for error indicators
-            error_selector = selectors['result']['error_indicator']
+            error_selector = as_css(selectors['result']['error_indicator'])
             if await page.locator(error_selector).count() > 0:
                 error_text = await page.locator(error_selector).first.text_content()
                 raise FormSubmissionError(f"Results page error: {error_text}")
             raise FormSubmissionError("Results table not found - form may not have been submitted successfully")
         
         # Extract membership ID from first column of first row in table
-        membership_selector = selectors['result']['membership_selector']
+        membership_selector = as_css(selectors['result']['membership_selector'])
         membership_element = page.locator(membership_selector)
         
         request_logger.info_event("extract_id", "Attempting to extract ID from table")
@@ -442,7 +426,7 @@ async def process_record(record: MembershipRecord, request_logger: LoggerAdapter
             request_logger.info_event("demo_success", "Demo completed - simulating membership creation")
             
             # In headful mode, let the user see the result for 3 seconds
-            if not config['HEADLESS']:
+            if not config.HEADLESS:
                 request_logger.info_event("demo_wait", "Keeping browser open for 3 seconds to show result")
                 await page.wait_for_timeout(3000)
             
@@ -620,7 +604,7 @@ if __name__ == "__main__":
     
     # Load config for port
     config = load_env()
-    port = config.get('PORT', 8000)
+    port = config.PORT
     
     uvicorn.run(
         "app:app",
@@ -46,8 +46,8 @@ WORKDIR /app
 COPY requirements.txt .
 RUN pip install -r requirements.txt
 COPY . .
-RUN python -m playwright install firefox
-RUN python -m playwright install-deps firefox
+RUN python -m playwright install chromium
+RUN python -m playwright install-deps chromium
 EXPOSE 8000
 CMD ["python", "app.py"]
 EOF
@@ -3,14 +3,20 @@ Unified logging configuration for the Schmick membership service.
 Provides both console and file logging for localhost and Railway deployment.
 """
 
+import atexit
+import copy
 import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 from datetime import datetime
 from typing import Any, Dict, Optional
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 
 class JSONFormatter(logging.Formatter):
     """Custom formatter that outputs structured JSON logs."""
@@ -18,7 +24,7 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         # Create the base log entry
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -41,11 +47,35 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_entry)
 
 
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps exc_info on queued records.
+    
+    The stdlib prepare() formats the traceback into the message and drops exc_info,
+    so JSONFormatter could no longer emit its "exception" field. Records never leave
+    the process, so only the message arguments are merged here.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a configured logger instance with both console and file output.
     Works on both localhost and Railway deployment.
     
+    Records are handed to a QueueHandler and written by a background
+    QueueListener thread, so logging from async code never blocks the
+    event loop on stdout or disk writes.
+    
+    The level comes from LOG_LEVEL (default INFO). Step-by-step detail is
+    logged at DEBUG with lazy %-style arguments, so in production it is
+    filtered out before any message formatting happens.
+    
     Args:
         name: The logger name (typically __name__)
         
@@ -56,18 +86,22 @@ def get_logger(name: str) -> logging.Logger:
     
     # Only configure if not already configured
     if not logger.handlers:
-        logger.setLevel(logging.INFO)
+        load_dotenv()
+        level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").strip().upper(), logging.INFO)
+        logger.setLevel(level)
+        handlers = []
+        file_error = None
         
         # 1. Console Handler (always enabled)
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(level)
         
         # Use simple formatter for console (readable)
         console_formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
         
         # 2. File Handler (logs directory)
         try:
@@ -78,16 +112,26 @@ def get_logger(name: str) -> logging.Logger:
             # Create file handler with rotation
             log_file = log_dir / "schmick_service.log"
             file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
+            file_handler.setLevel(level)
             
             # Use JSON formatter for file (structured)
             json_formatter = JSONFormatter()
             file_handler.setFormatter(json_formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
             
         except Exception as e:
             # If file logging fails (Railway restrictions), continue with console only
-            logger.warning(f"Could not set up file logging: {e}")
+            file_error = e
+        
+        # 3. Queue Handler - the caller only enqueues, the listener thread does the I/O
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(_QueueHandler(log_queue))
+        
+        if file_error:
+            logger.warning(f"Could not set up file logging: {file_error}")
         
         logger.propagate = False
     
@@ -2,7 +2,7 @@
 
 # Install Playwright browsers for Railway
 echo "Installing Playwright browsers..."
-python -m playwright install firefox
+python -m playwright install chromium
 
 # Set environment variables for Railway
 export HEADLESS=true
@@ -16,7 +16,7 @@ def install_playwright_browsers():
     try:
         print("🎭 Installing Playwright browsers...")
         result = subprocess.run([
-            sys.executable, "-m", "playwright", "install", "firefox"
+            sys.executable, "-m", "playwright", "install", os.getenv("BROWSER", "chromium")
         ], capture_output=True, text=True, timeout=300)
         
         if result.returncode == 0:
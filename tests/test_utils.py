@@ -0,0 +1,342 @@
+"""
+Unit tests for the pure helpers in utils.py.
+Run with: pytest tests/test_utils.py -v
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# utils.py lives in the project root, one level up from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from utils import (
+    NonRetryableError, RetryableError, StorageStateManager, auth_state_file,
+    format_membership_number, is_truthy, load_env, reload_env, retry_async
+)
+
+
+class TestFormatMembershipNumber:
+    """Test membership number prefix stripping."""
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("Membership Number: 12345", "12345"),
+        ("membership: 12345", "12345"),
+        ("Number: 12345", "12345"),
+        ("ID: 12345", "12345"),
+        ("Member ID: 12345", "12345"),
+        ("CONFIRMATION: 12345", "12345"),
+        ("Reference:12345", "12345"),
+    ])
+    def test_single_prefix(self, raw, expected):
+        """Test that each known label is stripped case-insensitively."""
+        assert format_membership_number(raw) == expected
+
+    def test_stacked_prefixes(self):
+        """Test that a run of labels is stripped completely, not just the first one."""
+        assert format_membership_number("number: membership: 5") == "5"
+        assert format_membership_number("Membership: ID: SCH-42") == "SCH-42"
+
+    def test_leading_colons_and_dashes(self):
+        """Test that stray colons/dashes left after the labels are removed."""
+        assert format_membership_number("ID: - 9") == "9"
+        assert format_membership_number(": 5") == "5"
+
+    def test_unknown_label_is_kept(self):
+        """Test that text before a colon that isn't a known label is left alone."""
+        assert format_membership_number("Account: 5") == "Account: 5"
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("12345", "12345"),
+        ("  12345\n", "12345"),
+        ("SCH-DEMO-123456789", "SCH-DEMO-123456789"),
+        ("Membership 12345", "Membership 12345"),
+    ])
+    def test_clean_value_fast_path(self, raw, expected):
+        """Test that colon-free values come back stripped and otherwise unchanged."""
+        assert format_membership_number(raw) == expected
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("-77", "77"),
+        ("  - 77", "77"),
+        ("--SCH-1", "SCH-1"),
+    ])
+    def test_leading_dash_without_colon(self, raw, expected):
+        """Test that a leading dash still goes through the dash cleanup."""
+        assert format_membership_number(raw) == expected
+
+    @pytest.mark.parametrize("raw", ["", None])
+    def test_empty(self, raw):
+        """Test that empty input returns an empty string."""
+        assert format_membership_number(raw) == ""
+
+
+class TestRetryAsync:
+    """Test retry_async backoff, cap and jitter."""
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        """Record requested sleep durations instead of sleeping."""
+        recorded = []
+
+        async def fake_sleep(delay):
+            recorded.append(delay)
+
+        monkeypatch.setattr(utils.asyncio, "sleep", fake_sleep)
+        return recorded
+
+    @staticmethod
+    def failing(times, result="ok"):
+        """Async callable that raises RetryableError the first `times` calls, then returns result."""
+        calls = []
+
+        async def func():
+            calls.append(None)
+            if len(calls) <= times:
+                raise RetryableError(f"failure {len(calls)}")
+            return result
+
+        func.calls = calls
+        return func
+
+    @pytest.mark.asyncio
+    async def test_backoff_is_capped_without_jitter(self, sleeps):
+        """Test that delays grow by backoff_factor and never exceed max_delay."""
+        func = self.failing(4)
+        result = await retry_async(func, max_retries=4, base_delay=1.0, backoff_factor=2.0,
+                                   max_delay=3.0, jitter=False)
+        assert result == "ok"
+        assert sleeps == [1.0, 2.0, 3.0, 3.0]
+
+    @pytest.mark.asyncio
+    async def test_jitter_is_on_by_default(self, sleeps, monkeypatch):
+        """Test that each sleep is drawn from [0, capped delay] when jitter is left on."""
+        bounds = []
+
+        def fake_uniform(low, high):
+            bounds.append((low, high))
+            return high / 2
+
+        monkeypatch.setattr(utils.random, "uniform", fake_uniform)
+        await retry_async(self.failing(3), base_delay=1.0, backoff_factor=2.0, max_delay=3.0)
+        assert bounds == [(0, 1.0), (0, 2.0), (0, 3.0)]
+        assert sleeps == [0.5, 1.0, 1.5]
+
+    @pytest.mark.asyncio
+    async def test_last_error_raised_after_max_retries(self, sleeps):
+        """Test that the last retryable error propagates once retries are exhausted."""
+        func = self.failing(10)
+        with pytest.raises(RetryableError, match="failure 3"):
+            await retry_async(func, max_retries=2, jitter=False)
+        assert len(func.calls) == 3
+        assert len(sleeps) == 2
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_error_propagates_immediately(self, sleeps):
+        """Test that other exceptions are raised on the first attempt without sleeping."""
+        async def func():
+            raise NonRetryableError("bad input")
+
+        with pytest.raises(NonRetryableError, match="bad input"):
+            await retry_async(func)
+        assert sleeps == []
+
+
+class TestAuthStateFile:
+    """Test that saved login sessions are keyed by both credentials."""
+
+    def test_same_credentials_same_file(self):
+        """Test that a username/password pair always resolves to the same file."""
+        assert auth_state_file("john@x.com", "secret") == auth_state_file("john@x.com", "secret")
+
+    @pytest.mark.parametrize("other", [
+        ("john_x.com", "secret"),   # collided with john@x.com under the old sanitised names
+        ("john@x.com", "wrong"),
+        ("jane@x.com", "secret"),
+        ("john@x.comsecret", ""),   # username/password boundary is part of the key
+    ])
+    def test_different_credentials_never_share_a_file(self, other):
+        """Test that a different user or password never maps to the same file."""
+        assert auth_state_file("john@x.com", "secret") != auth_state_file(*other)
+
+    def test_file_is_inside_auth_state_dir(self, tmp_path):
+        """Test that the file lives in the given directory and doesn't leak the credentials."""
+        path = auth_state_file("john@x.com", "secret", str(tmp_path))
+        assert Path(path).parent == tmp_path
+        assert "john" not in path and "secret" not in path
+
+
+class TestStorageStateManager:
+    """Test storage state persistence, the exists() cache and cleanup on failure."""
+
+    STATE = {"cookies": [{"name": "session", "value": "abc"}], "origins": []}
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Manager for a state file in a not-yet-created subdirectory."""
+        return StorageStateManager(tmp_path / "auth" / "state.json")
+
+    @staticmethod
+    def dir_contents(manager):
+        return sorted(os.listdir(os.path.dirname(manager.storage_file)))
+
+    def test_storage_file_is_plain_string(self, manager):
+        """Test that a path-like storage file is kept as a str."""
+        assert isinstance(manager.storage_file, str)
+
+    @pytest.mark.asyncio
+    async def test_save_then_load_round_trip(self, manager):
+        """Test that save creates the directory and load returns the same state."""
+        assert await manager.save(self.STATE) is True
+        assert manager.load() == self.STATE
+        assert await manager.load_async() == self.STATE
+        assert self.dir_contents(manager) == ["state.json"]
+
+    @pytest.mark.asyncio
+    async def test_save_replaces_existing_file(self, manager):
+        """Test that a second save overwrites the first without leaving temp files."""
+        await manager.save({"cookies": [], "origins": ["old"]})
+        await manager.save(self.STATE)
+        assert manager.load() == self.STATE
+        assert self.dir_contents(manager) == ["state.json"]
+
+    @pytest.mark.asyncio
+    async def test_unserialisable_state_is_not_written(self, manager):
+        """Test that a state that can't be encoded returns False and writes nothing."""
+        assert await manager.save({"cookies": [object()]}) is False
+        assert not os.path.exists(manager.storage_file)
+        assert manager.exists() is False
+
+    @pytest.mark.asyncio
+    async def test_failed_replace_removes_temp_file(self, manager, monkeypatch):
+        """Test that a failed swap keeps the old file and cleans up the temp file."""
+        await manager.save(self.STATE)
+
+        def failing_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(utils.os, "replace", failing_replace)
+        assert await manager.save({"cookies": [], "origins": []}) is False
+        assert self.dir_contents(manager) == ["state.json"]
+        assert manager.load() == self.STATE
+
+    def test_load_missing_file(self, manager):
+        """Test that loading a file that doesn't exist returns None."""
+        assert manager.load() is None
+
+    def test_load_corrupt_file(self, manager):
+        """Test that loading invalid JSON returns None."""
+        os.makedirs(os.path.dirname(manager.storage_file))
+        with open(manager.storage_file, "w") as f:
+            f.write('{"cookies": [')
+        assert manager.load() is None
+
+    def test_exists_is_cached_until_invalidate(self, manager):
+        """Test that exists() is cached and invalidate() forces a fresh check."""
+        assert manager.exists() is False
+        os.makedirs(os.path.dirname(manager.storage_file))
+        open(manager.storage_file, "w").close()
+        assert manager.exists() is False
+        manager.invalidate()
+        assert manager.exists() is True
+
+    @pytest.mark.asyncio
+    async def test_save_and_delete_update_exists(self, manager):
+        """Test that save() and delete() keep the exists() cache up to date."""
+        assert manager.exists() is False
+        await manager.save(self.STATE)
+        assert manager.exists() is True
+        assert manager.delete() is True
+        assert manager.exists() is False
+        assert not os.path.exists(manager.storage_file)
+
+    def test_delete_missing_file(self, manager):
+        """Test that deleting a file that isn't there still succeeds."""
+        assert manager.delete() is True
+        assert manager.exists() is False
+
+    def test_delete_failure(self, manager, monkeypatch):
+        """Test that an unlink error returns False and drops the cached exists() result."""
+        assert manager.exists() is False
+
+        def failing_unlink(path):
+            raise PermissionError("read-only")
+
+        monkeypatch.setattr(utils.os, "unlink", failing_unlink)
+        assert manager.delete() is False
+        assert manager._exists_cache is None
+
+
+class TestIsTruthy:
+    """Test the shared yes/no parsing used for HEADLESS and n8n booleans."""
+
+    @pytest.mark.parametrize("value", [True, 1, "1", "true", "TRUE", " Yes ", "y", "on"])
+    def test_truthy(self, value):
+        """Test that the accepted "yes" spellings are truthy."""
+        assert is_truthy(value) is True
+
+    @pytest.mark.parametrize("value", [False, 0, None, "", "0", "false", "no", "off", "truthy", 2])
+    def test_falsy(self, value):
+        """Test that everything else is falsy."""
+        assert is_truthy(value) is False
+
+
+class TestLoadEnv:
+    """Test configuration parsing and caching."""
+
+    @pytest.fixture(autouse=True)
+    def clean_config(self, monkeypatch):
+        """Ignore any local .env file and start every test without a cached config."""
+        monkeypatch.setattr(utils, "load_dotenv", lambda: None)
+        monkeypatch.setattr(utils, "_config", None)
+        for name in ("HEADLESS", "PW_SLOW_MO", "AUTH_STATE_TTL"):
+            monkeypatch.delenv(name, raising=False)
+
+    @pytest.mark.parametrize("raw, expected", [("250", 250), ("", 0), ("slow", 0), ("1.5", 0)])
+    def test_pw_slow_mo_falls_back_on_bad_values(self, monkeypatch, raw, expected):
+        """Test that an empty or non-numeric PW_SLOW_MO doesn't break startup."""
+        monkeypatch.setenv("PW_SLOW_MO", raw)
+        assert load_env().PW_SLOW_MO == expected
+
+    @pytest.mark.parametrize("raw, expected", [("600", 600), ("", 3600), ("1h", 3600)])
+    def test_auth_state_ttl_falls_back_on_bad_values(self, monkeypatch, raw, expected):
+        """Test that an empty or non-numeric AUTH_STATE_TTL uses the default."""
+        monkeypatch.setenv("AUTH_STATE_TTL", raw)
+        assert load_env().AUTH_STATE_TTL == expected
+
+    def test_defaults(self):
+        """Test the defaults when the variables are unset."""
+        config = load_env()
+        assert config.PW_SLOW_MO == 0
+        assert config.AUTH_STATE_TTL == 3600
+        assert config.HEADLESS is True
+
+    @pytest.mark.parametrize("raw, expected", [("1", True), ("yes", True), ("true", True), ("0", False), ("false", False)])
+    def test_headless_uses_truthy_parsing(self, monkeypatch, raw, expected):
+        """Test that HEADLESS accepts the same spellings as is_truthy."""
+        monkeypatch.setenv("HEADLESS", raw)
+        assert load_env().HEADLESS is expected
+
+    def test_config_is_cached(self, monkeypatch):
+        """Test that later calls return the same object and ignore environment changes."""
+        config = load_env()
+        monkeypatch.setenv("PW_SLOW_MO", "500")
+        assert load_env() is config
+        assert load_env().PW_SLOW_MO == 0
+
+    def test_reload_env_picks_up_changes(self, monkeypatch):
+        """Test that reload_env() re-reads the environment and replaces the cache."""
+        config = load_env()
+        monkeypatch.setenv("PW_SLOW_MO", "500")
+        reloaded = reload_env()
+        assert reloaded is not config
+        assert reloaded.PW_SLOW_MO == 500
+        assert load_env() is reloaded
+
+    def test_config_is_immutable(self):
+        """Test that the shared config can't be mutated by a caller."""
+        with pytest.raises(AttributeError):
+            load_env().PORT = 1
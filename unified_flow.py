@@ -9,18 +9,310 @@ This function works identically on both localhost and Railway for:
 import asyncio
 import os
 import json
-import uuid
+import time
+import secrets
 from datetime import datetime
-from playwright.async_api import async_playwright
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from dotenv import load_dotenv
-from website_selectors import selectors, FIELD_MAPPING
+from logger import get_logger
+from utils import StorageStateManager, auth_state_file, is_truthy, load_env
+from website_selectors import selectors, as_css, FIELD_SELECTORS, TIMEOUTS
 
+# Use uvloop when available (installed with uvicorn[standard]) - faster event loop for
+# the Playwright pipe traffic; uvicorn already picks it for the server, this covers CLI runs
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
-# Enhanced logging functions
-def log_user_request(member_data, request_id=None):
+# orjson serialises the logged member data several times faster; stdlib json is the fallback
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+
+logger = get_logger(__name__)
+
+# Shared Playwright + browser - each membership only opens its own (cheap, isolated) context
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+# Serialises logins so concurrent requests reuse one saved session instead of racing
+_auth_lock = asyncio.Lock()
+
+# Serialises submit + member ID lookup. The API and View Members fallbacks read "the newest
+# member", which is only this request's member if no other submission lands in between.
+_submit_lock = asyncio.Lock()
+
+# Browser context settings shared by the login and form-filling contexts
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+}
+
+# User agent per browser engine, so the reported browser matches the one actually driving the page
+USER_AGENTS = {
+    'chromium': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'firefox': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+}
+
+# Launch flags for Chromium (Firefox ignores them, so they are only passed to Chromium)
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding'
+]
+
+# Requests the automation never needs - aborted so page loads only fetch documents, scripts,
+# stylesheets (Kendo widget visibility depends on them) and XHR
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_HOSTS = frozenset({"google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net", "hotjar.com"})
+_BLOCKED_HOST_SUFFIXES = tuple("." + host for host in BLOCKED_HOSTS)
+
+
+def _is_blocked_host(url):
+    """True when the URL's host is one of BLOCKED_HOSTS or a subdomain of one"""
+    hostname = urlsplit(url).hostname or ""
+    return hostname in BLOCKED_HOSTS or hostname.endswith(_BLOCKED_HOST_SUFFIXES)
+
+
+async def _route_request(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _new_context(browser, **options):
+    """Open a browser context with the shared settings and unneeded resources blocked"""
+    context = await browser.new_context(
+        user_agent=USER_AGENTS.get(browser.browser_type.name),
+        **options,
+        **CONTEXT_OPTIONS
+    )
+    await context.route("**/*", _route_request)
+    return context
+
+
+_FIELD_SELECTOR_BY_KEY = dict(FIELD_SELECTORS)
+
+
+def _resolve_field_selectors(fields):
+    """(field, selector) pairs for the record fields that have an Add Member form selector"""
+    return tuple((field, _FIELD_SELECTOR_BY_KEY[field]) for field in fields if field in _FIELD_SELECTOR_BY_KEY)
+
+
+# Add Member form fields by input type, resolved to their selectors once at import
+_TEXT_FIELDS = _resolve_field_selectors((
+    'businessName', 'firstName', 'lastName', 'email', 'address', 'city',
+    'postalAddress', 'startDate', 'postcode', 'mobile', 'phoneAH', 'distributorPONumber', 'distributorReference',
+    'rego', 'colour', 'retailFee'
+))
+_SELECT_FIELDS = _resolve_field_selectors(('state', 'carType', 'dealerId', 'prdId', 'vehPayOpt', 'year', 'make', 'model'))
+_CHECKBOX_FIELDS = _resolve_field_selectors(('alloyWheels', 'paintProtection'))
+
+# State abbreviations -> names used by the Add Member state dropdown
+STATE_NAMES = {
+    'ACT': 'Australian Capital Territory',
+    'A.C.T': 'Australian Capital Territory',
+    'NSW': 'New South Wales',
+    'N.S.W': 'New South Wales',
+    'NT': 'Northern Territory',
+    'N.T': 'Northern Territory',
+    'QLD': 'Queensland',
+    'SA': 'South Australia',
+    'S.A': 'South Australia',
+    'TAS': 'Tasmania',
+    'VIC': 'Victoria',
+    'WA': 'Western Australia',
+    'W.A': 'Western Australia',
+    'NZ': 'New Zealand'  # if needed
+}
+
+# Validation error selectors checked after the Add Member form is submitted
+KENDO_VALIDATION_SELECTOR = ".k-widget.k-tooltip.k-tooltip-validation.k-invalid-msg"
+# Common validation error patterns, unioned into one CSS selector so they are matched in a single query
+BACKUP_VALIDATION_SELECTOR = ", ".join([
+    ".error",
+    ".field-error",
+    ".validation-error",
+    ".alert-danger",
+    ".text-danger",
+    "[class*='error']",
+    "[class*='invalid']",
+    ".help-block.text-danger",
+    ".invalid-feedback"
+])
+# OK buttons of the Kendo duplicate-rego window, unioned so they are matched in a single query
+KENDO_OK_BUTTON_SELECTOR = ", ".join([
+    "body > div.k-widget.k-window > div.k-window-content.k-content > div:nth-child(2) > button",
+    ".k-window .k-window-content .k-content button:has-text('OK')",
+    ".k-window .k-button:has-text('OK')"
+])
+RED_TEXT_SELECTOR = "[style*='color: red'], [style*='color:red'], .text-red"
+
+# Sets input values and fires the events form bindings listen for; returns the selectors it filled
+JS_FILL_FIELDS = """(pairs) => {
+    const filled = [];
+    for (const [selector, value] of Object.entries(pairs)) {
+        const el = document.querySelector(selector);
+        if (!el) continue;
+        el.focus();
+        el.value = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.blur();
+        filled.push(selector);
+    }
+    return filled;
+}"""
+
+# Clicks the first element matching a selector (fallback when a Playwright click fails)
+JS_CLICK = "(selector) => document.querySelector(selector).click()"
+
+# Ticks each checkbox via click() so its change handlers fire; returns the selectors now checked
+JS_CHECK_FIELDS = """(selectorList) => {
+    const checked = [];
+    for (const selector of selectorList) {
+        const el = document.querySelector(selector);
+        if (!el) continue;
+        if (!el.checked) el.click();
+        if (el.checked) checked.push(selector);
+    }
+    return checked;
+}"""
+
+# Collects all validation errors inside the page so the scan costs one round-trip.
+# Kendo tooltips are authoritative - when present, the fallback scans are skipped.
+JS_VALIDATION_SCAN = """({ kendoSelector, backupSelector, redSelector }) => {
+    const text = (el) => (el.textContent || '').trim();
+    const all = (selector) => Array.from(document.querySelectorAll(selector));
+    const kendo = all(kendoSelector).map(el => ({ text: text(el), field: el.getAttribute('data-for') }));
+    if (kendo.some(error => error.text)) {
+        return { kendo, backup: [], red: [], invalid: { count: 0, fields: [] } };
+    }
+    const invalid = all(':invalid');
+    return {
+        kendo,
+        backup: all(backupSelector).map(text),
+        red: all(redSelector).map(text),
+        invalid: {
+            count: invalid.length,
+            fields: invalid.slice(0, 5).map(el => el.getAttribute('name') || el.id || 'unknown'),
+        },
+    };
+}"""
+
+# Installed on every page via add_init_script so the scan is compiled once per document
+# and each check is just a call to window.__scanSchmickErrors()
+JS_INSTALL_VALIDATION_SCAN = (
+    f"window.__scanSchmickErrors = () => ({JS_VALIDATION_SCAN})("
+    + json.dumps({
+        "kendoSelector": KENDO_VALIDATION_SELECTOR,
+        "backupSelector": BACKUP_VALIDATION_SELECTOR,
+        "redSelector": RED_TEXT_SELECTOR,
+    })
+    + ");"
+)
+
+
+# Separator line closing each entry in the request/validation logs
+_SEP = "-" * 80 + "\n"
+
+
+def _write_file(path, text):
+    """Overwrite a file with text (called via asyncio.to_thread)"""
+    with open(path, "w") as f:
+        f.write(text)
+
+
+# Log entries are queued and written by a single background task, off the request path.
+# Only that task touches the log files, so their handles stay open between batches.
+_LOG_BATCH_SIZE = 50
+_log_queue = None
+_log_writer_task = None
+_log_files = {}
+
+
+def _append_to_log(path, text):
+    """Append text to a log file through its cached handle (called via asyncio.to_thread)"""
+    log_file = _log_files.get(path)
+    if log_file is None:
+        log_file = _log_files[path] = open(path, "a")
+    log_file.write(text)
+    log_file.flush()
+
+
+def _close_log_files():
+    for log_file in _log_files.values():
+        log_file.close()
+    _log_files.clear()
+
+
+async def _drain_logs():
+    """Write queued (path, text) log entries, batching whatever is already waiting"""
+    while True:
+        batch = [await _log_queue.get()]
+        while len(batch) < _LOG_BATCH_SIZE and not _log_queue.empty():
+            batch.append(_log_queue.get_nowait())
+        
+        by_path = {}
+        for path, text in batch:
+            by_path.setdefault(path, []).append(text)
+        
+        for path, texts in by_path.items():
+            try:
+                await asyncio.to_thread(_append_to_log, path, "".join(texts))
+            except Exception as e:
+                logger.warning(f"   ⚠️  Error writing {path}: {str(e)}")
+        
+        for _ in batch:
+            _log_queue.task_done()
+
+
+def _enqueue_log(path, text):
+    """Queue a log entry for the background writer, starting it on first use"""
+    global _log_queue, _log_writer_task
+    
+    if _log_queue is None:
+        _log_queue = asyncio.Queue()
+    if _log_writer_task is None or _log_writer_task.done():
+        _log_writer_task = asyncio.create_task(_drain_logs())
+    _log_queue.put_nowait((path, text))
+
+
+async def flush_logs():
+    """Wait for queued log entries to be written and stop the writer (call on shutdown)"""
+    global _log_writer_task
+    
+    if _log_writer_task is None:
+        return
+    if not _log_writer_task.done():
+        await _log_queue.join()
+        _log_writer_task.cancel()
+    _log_writer_task = None
+    _close_log_files()
+
+
+# Enhanced logging functions - entries are handed to the background writer
+async def log_user_request(member_data, request_id=None):
     """Log user request data to requests.log"""
     if not request_id:
-        request_id = str(uuid.uuid4())[:8]
+        request_id = secrets.token_hex(4)
     
     request_entry = {
         "timestamp": datetime.now().isoformat(),
@@ -29,35 +321,38 @@ def log_user_request(member_data, request_id=None):
     }
     
     try:
-        with open("requests.log", "a") as f:
-            f.write(f"\n[{request_entry['timestamp']}] REQUEST_ID: {request_id}\n")
-            f.write(f"USER DATA: {json.dumps(member_data, indent=2)}\n")
-            f.write("-" * 80 + "\n")
+        # Header, body and separator go out as a single entry
+        _enqueue_log(
+            "requests.log",
+            f"\n[{request_entry['timestamp']}] REQUEST_ID: {request_id}\n"
+            f"USER DATA: {_dumps(member_data)}\n"
+            + _SEP
+        )
         
-        print(f"   📝 Request logged with ID: {request_id}")
+        logger.debug("   📝 Request logged with ID: %s", request_id)
         return request_id
     except Exception as e:
-        print(f"   ⚠️  Error logging request: {str(e)}")
+        logger.warning(f"   ⚠️  Error logging request: {str(e)}")
         return request_id
 
-def log_validation_errors_with_user_data(validation_errors, current_url, member_data, request_id):
+async def log_validation_errors_with_user_data(validation_errors, current_url, member_data, request_id):
     """Log validation errors with associated user data"""
     try:
-        error_log_entry = f"\n[{datetime.now().isoformat()}] VALIDATION ERRORS\n"
-        error_log_entry += f"REQUEST_ID: {request_id}\n"
-        error_log_entry += f"URL: {current_url}\n"
-        error_log_entry += f"USER_DATA: {json.dumps(member_data, indent=2)}\n"
-        error_log_entry += "VALIDATION_ERRORS:\n"
-        for error in validation_errors:
-            error_log_entry += f"  - {error}\n"
-        error_log_entry += "-" * 80 + "\n"
-        
-        with open("validation_errors.log", "a") as f:
-            f.write(error_log_entry)
-        
-        print(f"   📝 Validation errors logged with user data (Request ID: {request_id})")
+        error_log_entry = "".join([
+            f"\n[{datetime.now().isoformat()}] VALIDATION ERRORS\n",
+            f"REQUEST_ID: {request_id}\n",
+            f"URL: {current_url}\n",
+            f"USER_DATA: {_dumps(member_data)}\n",
+            "VALIDATION_ERRORS:\n",
+            *(f"  - {error}\n" for error in validation_errors),
+            _SEP,
+        ])
+        
+        _enqueue_log("validation_errors.log", error_log_entry)
+        
+        logger.info(f"   📝 Validation errors logged with user data (Request ID: {request_id})")
     except Exception as e:
-        print(f"   ⚠️  Error logging validation errors: {str(e)}")
+        logger.warning(f"   ⚠️  Error logging validation errors: {str(e)}")
 
 
 # Helper to dismiss the Kendo duplicate rego popup (OK button)
@@ -66,13 +361,8 @@ async def dismiss_duplicate_rego_popup(page, timeout_ms: int = 4000) -> bool:
     Click OK on the Kendo modal shown for duplicate registration numbers.
     Returns True if a modal was detected and dismissed, else False.
     """
-    # Try common Kendo OK buttons
-    candidates = [
-        "body > div.k-widget.k-window > div.k-window-content.k-content > div:nth-child(2) > button",
-        ".k-window .k-window-content .k-content button:has-text('OK')",
-        ".k-window .k-button:has-text('OK')",
-        "button:has-text('OK')"
-    ]
+    # Kendo window OK buttons in one compound query, then any OK button as a last resort
+    candidates = [KENDO_OK_BUTTON_SELECTOR, "button:has-text('OK')"]
     # Quick presence check for any Kendo window
     try:
         # Wait briefly for any Kendo window to show
@@ -84,21 +374,315 @@ async def dismiss_duplicate_rego_popup(page, timeout_ms: int = 4000) -> bool:
     for sel in candidates:
         try:
             btn = page.locator(sel).first
-            if await btn.count() > 0:
-                await btn.wait_for(state="visible", timeout=1500)
-                await btn.click()
-                print("   ✅ Duplicate rego popup dismissed (OK clicked)")
-                return True
+            await btn.wait_for(state="visible", timeout=1500)
+            await btn.click()
+            logger.info("   ✅ Duplicate rego popup dismissed (OK clicked)")
+            return True
         except Exception:
             continue
     return False
 
+
+async def get_browser():
+    """
+    Return the shared browser, starting Playwright and launching it on first use.
+    Chromium by default; set BROWSER=firefox to use Firefox instead.
+    The FastAPI app calls this at startup so the first request doesn't pay for the launch.
+    """
+    global _playwright, _browser
+    
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            
+            config = load_env()
+            headless_mode = config.HEADLESS
+            logger.info(f"🖥️ Headless mode: {headless_mode}")
+            
+            # slow_mo only helps when watching a headed browser - never delay headless runs
+            slow_mo = 0 if headless_mode else config.PW_SLOW_MO
+            
+            # Configure the browser for both local and cloud deployment
+            browser_type = _playwright.firefox if config.BROWSER == "firefox" else _playwright.chromium
+            _browser = await browser_type.launch(
+                headless=headless_mode,
+                slow_mo=slow_mo,
+                args=CHROMIUM_ARGS if browser_type.name == "chromium" else []
+            )
+            logger.info(f"🌐 Browser launched: {browser_type.name}")
+        return _browser
+
+
+async def close_browser():
+    """Close the shared browser and stop Playwright (call on shutdown)"""
+    global _playwright, _browser
+    
+    async with _browser_lock:
+        if _browser:
+            await _browser.close()
+            _browser = None
+        if _playwright:
+            await _playwright.stop()
+            _playwright = None
+
+
+def _auth_state_manager(username, password):
+    """Storage state manager for the saved login session of a Schmick user and password"""
+    return StorageStateManager(auth_state_file(username, password, os.getenv("AUTH_STATE_DIR", ".auth")))
+
+
+async def ensure_auth(browser, username, password, force_login=False):
+    """
+    Return the path of a saved login session (Playwright storage state) for username/password.
+    
+    The login flow only runs when there is no saved session, the saved one is older
+    than AUTH_STATE_TTL seconds, or force_login is set (e.g. the site rejected it).
+    If the session can't be written to disk the storage state dict itself is returned
+    instead (new_context accepts either). Raises RuntimeError when the login doesn't
+    complete, without saving anything.
+    """
+    storage = _auth_state_manager(username, password)
+    state_path = str(storage.storage_file)
+    auth_state_ttl = load_env().AUTH_STATE_TTL  # seconds
+    
+    async with _auth_lock:
+        if force_login:
+            storage.delete()
+        elif storage.exists() and time.time() - os.path.getmtime(state_path) < auth_state_ttl:
+            logger.info("🔐 Step 1: Reusing saved Schmick Club session")
+            return state_path
+        
+        context = await _new_context(browser)
+        try:
+            page = await context.new_page()
+            page.set_default_timeout(30000)
+            page.set_default_navigation_timeout(45000)
+            
+            logger.info("🔐 Step 1: Logging into Schmick Club...")
+            login_url = selectors['login']['url']
+            await page.goto(login_url, wait_until='domcontentloaded', timeout=45000)
+            
+            # Fill login credentials (fill auto-waits for each field)
+            await page.locator(as_css(selectors['login']['username'])).first.fill(username, timeout=10000)
+            logger.debug("   ✅ Filled username: %s", username)
+            
+            await page.locator(as_css(selectors['login']['password'])).first.fill(password, timeout=10000)
+            logger.debug("   ✅ Filled password")
+            
+            # Submit login
+            await page.click(as_css(selectors['login']['submit']))
+            logger.debug("   🚀 Clicked Login button")
+            
+            # Wait for login to complete - the password field goes away once the session is established
+            try:
+                await page.wait_for_selector(as_css(selectors['login']['password']), state='hidden', timeout=TIMEOUTS['login'])
+                await page.wait_for_load_state('domcontentloaded')
+            except Exception as login_wait_error:
+                # Don't cache a logged-out state as a session (wrong password, CAPTCHA, slow site)
+                logger.error(f"   ❌ Login completion not detected: {login_wait_error}")
+                raise RuntimeError("Schmick Club login did not complete") from login_wait_error
+            logger.debug("   🔗 URL after login: %s", page.url)
+            
+            storage_state = await context.storage_state()
+            if await storage.save(storage_state):
+                return state_path
+            logger.warning("   ⚠️ Could not save login session to %s - using it in memory only", state_path)
+            return storage_state
+        finally:
+            await context.close()
+
+
+async def fill_text_fields(page, member_data, filled_fields):
+    """
+    Fill every text/email field present in member_data with one page.evaluate call
+    (skipped entirely when there is nothing to fill). Appends filled field names
+    to filled_fields.
+    """
+    text_values = [
+        (field, selector, str(member_data[field]))
+        for field, selector in _TEXT_FIELDS
+        if member_data.get(field)
+    ]
+    if not text_values:
+        return
+    
+    try:
+        filled_selectors = set(await page.evaluate(
+            JS_FILL_FIELDS,
+            {selector: value for _, selector, value in text_values}
+        ))
+    except Exception as e:
+        logger.warning(f"   ⚠️ Failed to fill text fields: {e}")
+        return
+    
+    for field, selector, value in text_values:
+        if selector in filled_selectors:
+            filled_fields.append(field)
+        else:
+            logger.warning(f"   ⚠️ Failed to fill {field}: element {selector} not found")
+
+
+async def set_pre_existing_damage(page, value):
+    """
+    Select the Pre-existing Damage radio (robust: radio -> label -> JS -> verify).
+    Returns True when "Yes" was selected, False for "No"; raises if the radio
+    could not be set.
+    """
+    desired_yes = is_truthy(value)
+    target_id = "yes" if desired_yes else "no"
+
+    # Prefer the specific visible container to avoid hidden duplicates
+    container = page.locator(".preExistingDamage1").first
+    await container.wait_for(state="visible", timeout=10000)
+
+    yes_radio = container.locator("input#yes[name='preExistingDamage'][value='1']").first
+    no_radio  = container.locator("input#no[name='preExistingDamage'][value='0']").first
+    target_radio = yes_radio if desired_yes else no_radio
+    other_radio  = no_radio if desired_yes else yes_radio
+    target_label = container.locator(f"label[for='{target_id}']").first
+
+    # Ensure in view
+    await target_radio.scroll_into_view_if_needed()
+
+    # Strategy 1: native set_checked
+    try:
+        if not await target_radio.is_checked():
+            await target_radio.set_checked(True, force=True)
+    except Exception:
+        pass
+
+    # Strategy 2: click the label (often used for styled radios)
+    if not await target_radio.is_checked() and await target_label.count() > 0:
+        await target_label.scroll_into_view_if_needed()
+        await target_label.click(force=True)
+
+    # Strategy 3: JS set + dispatch events
+    if not await target_radio.is_checked():
+        await page.evaluate(
+            """(id) => {
+                const el = document.getElementById(id);
+                if (el) {
+                    el.checked = true;
+                    el.dispatchEvent(new Event('input', { bubbles: true }));
+                    el.dispatchEvent(new Event('change', { bubbles: true }));
+                    const form = el.form;
+                    if (form) {
+                        form.dispatchEvent(new Event('input', { bubbles: true }));
+                        form.dispatchEvent(new Event('change', { bubbles: true }));
+                    }
+                }
+            }""",
+            target_id
+        )
+
+    # Verify final state (and the opposite one is off)
+    is_checked = await target_radio.is_checked()
+    if not is_checked:
+        # Fallback to configured selectors if present
+        try:
+            new_membership = selectors['new_membership']
+            yes_sel = new_membership.get('pre_existing_damage_yes')
+            no_sel  = new_membership.get('pre_existing_damage_no')
+            if yes_sel and no_sel:
+                await page.locator(yes_sel if desired_yes else no_sel).scroll_into_view_if_needed()
+                await page.check(yes_sel if desired_yes else no_sel, force=True)
+                is_checked = await page.is_checked(yes_sel if desired_yes else no_sel)
+        except Exception:
+            pass
+
+    if not is_checked:
+        raise RuntimeError("Radio did not change state after all strategies")
+
+    # Optional: ensure other is unchecked
+    try:
+        if await other_radio.count() > 0 and await other_radio.is_checked():
+            # If both are somehow checked (custom UI), uncheck the other via JS
+            await page.evaluate(
+                """(id) => {
+                    const el = document.getElementById(id);
+                    if (el) {
+                        el.checked = false;
+                        el.dispatchEvent(new Event('change', { bubbles: true }));
+                    }
+                }""",
+                "no" if desired_yes else "yes"
+            )
+    except Exception:
+        pass
+
+    return desired_yes
+
+
+async def member_id_from_response(response_future, timeout=5):
+    """
+    Return the member ID from the JSON body of the Add Member POST response,
+    or None when no such response arrived, it wasn't successful or its body has
+    no recognisable ID.
+    """
+    try:
+        response = await asyncio.wait_for(response_future, timeout)
+        if not response.ok:
+            return None
+        body = await response.json()
+    except Exception:
+        return None
+    
+    return _member_id_from_json(body)
+
+
+def _member_id_from_json(body):
+    """The member ID field of a JSON member record, or None if it has none"""
+    if isinstance(body, dict):
+        for key in ('id', 'memberId', 'member_id', 'ID'):
+            value = body.get(key)
+            if value and str(value).strip():
+                return str(value).strip()
+    return None
+
+
+async def member_id_from_api(context):
+    """
+    Return the newest member's ID from the JSON endpoint in MEMBERS_API_URL, fetched with the
+    context's session cookies (no page load). Returns None when the URL isn't configured, the
+    request fails or the response shape isn't recognised - the caller then scrapes the table.
+    Accepts a list of members, or an object holding one under 'items', 'data' or 'members'.
+    """
+    api_url = os.getenv("MEMBERS_API_URL")
+    if not api_url:
+        return None
+    
+    try:
+        response = await context.request.get(api_url, timeout=10000)
+        if not response.ok:
+            return None
+        body = await response.json()
+    except Exception:
+        return None
+    
+    if isinstance(body, dict):
+        body = next((body[key] for key in ('items', 'data', 'members') if isinstance(body.get(key), list)), None)
+    if isinstance(body, list) and body:
+        return _member_id_from_json(body[0])
+    return None
+
+
+async def save_extracted_id(extracted_id):
+    """Save the extracted member ID to extracted_id.txt for reference"""
+    try:
+        await asyncio.to_thread(_write_file, "extracted_id.txt", extracted_id)
+        logger.debug("   💾 ID saved to 'extracted_id.txt'")
+    except Exception as file_error:
+        logger.warning(f"   ⚠️ Could not save to file: {file_error}")
+
+
 async def create_schmick_membership(member_data):
     """
     Complete Schmick Club membership creation workflow.
     
     Flow:
     1. Login to https://app.schmickclub.com/memberships/distributors
+       (skipped while a saved session from ensure_auth is still valid)
     2. Navigate to Add Member form  
     3. Fill membership form with provided data
     4. Submit form and handle validation
@@ -107,373 +691,219 @@ async def create_schmick_membership(member_data):
     """
     
     # Generate request ID and log the incoming request
-    request_id = str(uuid.uuid4())[:8]
+    request_id = secrets.token_hex(4)
     
-    print("🧪 LOCAL TESTING MODE")
-    print("=" * 50)
-    print("📋 Using test data - this will be replaced by JSON from n8n")
-    print()
-    
-    print("🔐 Schmick Club Membership Creation")
-    print("=" * 45)
-    print(f"👤 Creating membership for: {member_data.get('firstName', 'N/A')} {member_data.get('lastName', 'N/A')}")
-    print(f"🆔 Request ID: {request_id}")
+    # Banner goes out as one log record rather than one per line
+    logger.info(
+        "🔐 Schmick Club Membership Creation\n"
+        + "=" * 45 + "\n"
+        + f"👤 Creating membership for: {member_data.get('firstName', 'N/A')} {member_data.get('lastName', 'N/A')}\n"
+        + f"🆔 Request ID: {request_id}"
+    )
     
     # Log the user request
-    log_user_request(member_data, request_id)
+    await log_user_request(member_data, request_id)
     
     # Load credentials
     load_dotenv()
     username = member_data["u"]
     password = member_data["p"]
 
-    playwright = None
-    browser = None
     context = None
-
-    headless_env = os.getenv("HEADLESS", "true")
-    headless_mode = str(headless_env).strip().lower() in ("1", "true", "yes", "on")
-    print(f"🖥️ Headless mode: {headless_mode}")
+    submit_locked = False
     
     try:
-        playwright = await async_playwright().start()
-        
-        # Configure Firefox for both local and cloud deployment
-        browser = await playwright.firefox.launch(
-            headless=headless_mode,
-            slow_mo=300,  # Increased delay for stability
-            args=[
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor',
-                '--disable-gpu',
-                '--disable-software-rasterizer',
-                '--disable-background-timer-throttling',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-renderer-backgrounding'
-            ]
-        )
-        
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0'
-        )
-        
-        page = await context.new_page()
-        
-        # Set longer timeouts for headless mode
-        page.set_default_timeout(30000)  # Increased to 60 seconds
-        page.set_default_navigation_timeout(45000)  # Increased to 90 seconds
-        
-        # STEP 1: LOGIN
-        print("🔐 Step 1: Logging into Schmick Club...")
-        login_url = selectors['login']['url']
-        await page.goto(login_url, wait_until='networkidle', timeout=45000)
-        
-        # Fill login credentials
-        await page.wait_for_selector(selectors['login']['username'], timeout=10000)
-        await page.fill(selectors['login']['username'], username)
-        print(f"   ✅ Filled username: {username}")
-        
-        await page.wait_for_selector(selectors['login']['password'], timeout=10000)  
-        await page.fill(selectors['login']['password'], password)
-        print("   ✅ Filled password")
-        
-        # Submit login
-        await page.click(selectors['login']['submit'])
-        print("   🚀 Clicked Login button")
-        
-        # Wait for login to complete
-        await page.wait_for_timeout(5000)
-        print(f"   🔗 URL after login: {page.url}")
+        browser = await get_browser()
         
+        # STEP 1: RESTORE LOGIN SESSION (logs in only when there is no valid saved session)
         # STEP 2: NAVIGATE TO ADD MEMBER FORM
-        print("\n📝 Step 2: Navigating to Add Member form...")
-        add_member_url = selectors['new_membership']['url']
-        await page.goto(add_member_url, wait_until='networkidle', timeout=45000)
+        new_membership = selectors['new_membership']
+        add_member_url = new_membership['url']
+        for attempt in range(2):
+            auth_state = await ensure_auth(browser, username, password, force_login=attempt > 0)
+            context = await _new_context(browser, storage_state=auth_state)
+            await context.add_init_script(JS_INSTALL_VALIDATION_SCAN)
+            page = await context.new_page()
+            
+            # Set longer timeouts for headless mode
+            page.set_default_timeout(30000)  # Increased to 60 seconds
+            page.set_default_navigation_timeout(45000)  # Increased to 90 seconds
+            
+            logger.info("📝 Step 2: Navigating to Add Member form...")
+            await page.goto(add_member_url, wait_until='domcontentloaded', timeout=45000)
+            
+            # Wait for either the form's first field or a login form, whichever this page turns out to be
+            await page.wait_for_selector(f"#businessName, {as_css(selectors['login']['password'])}", timeout=10000)
+            
+            # A login form here means the saved session has expired - log in again once
+            if attempt or await page.locator(as_css(selectors['login']['password'])).count() == 0:
+                break
+            logger.warning("   ⚠️ Saved session expired - logging in again")
+            await context.close()
         
         # Wait for form to be ready - wait for the first field to appear
         await page.wait_for_selector("#businessName", timeout=10000)
-        print("   ✅ Add Member form loaded")
+        logger.info("   ✅ Add Member form loaded")
         
         # STEP 3: FILL FORM FIELDS
-        print("\n✏️  Step 3: Filling membership form...")
+        logger.info("✏️  Step 3: Filling membership form...")
         
         filled_fields = []
         
         # Fill text and email fields
-        text_fields = [
-            'businessName', 'firstName', 'lastName', 'email', 'address', 'city', 
-            'postalAddress', 'startDate', 'postcode', 'mobile', 'phoneAH', 'distributorPONumber', 'distributorReference',
-            'rego', 'colour', 'retailFee'
-        ]
+        await fill_text_fields(page, member_data, filled_fields)
         
-        for field in text_fields:
-            if field in member_data and member_data[field]:
-                selector_key = FIELD_MAPPING.get(field)
-                if selector_key and selector_key in selectors['new_membership']:
-                    try:
-                        selector = selectors['new_membership'][selector_key]
-                        await page.fill(selector, str(member_data[field]))
-                        filled_fields.append(field)
-                        print(f"   ✅ Filled {field}: {member_data[field]}")
-
-                        # Handle possible duplicate rego modal only when rego is filled
-                        if field == 'rego':
-                            try:
-                                # Trigger any onChange/onBlur validation the site uses
-                                await page.press(selector, "Enter")
-                            except Exception:
-                                pass
-                            try:
-                                # Move focus away to ensure validation runs
-                                await page.keyboard.press("Tab")
-                            except Exception:
-                                pass
-                            # Only click OK if the modal actually appears
-                            try:
-                                handled = await dismiss_duplicate_rego_popup(page, timeout_ms=4000)
-                                if handled:
-                                    print("   ℹ️ Duplicate rego detected and acknowledged")
-                            except Exception as dup_e:
-                                print(f"   ⚠️ Error handling duplicate rego popup: {dup_e}")
-
-                        # Add small delay in headless mode for stability
-                        if headless_mode:
-                            await page.wait_for_timeout(100)
-
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to fill {field}: {e}")
-        
-        # Handle select dropdowns
-        select_fields = ['state', 'carType', 'dealerId', 'prdId', 'vehPayOpt', 'year', 'make', 'model']
-        
-        for field in select_fields:
-            if field in member_data and member_data[field]:
-                selector_key = FIELD_MAPPING.get(field)
-                if selector_key and selector_key in selectors['new_membership']:
-                    try:
-                        # Wait before interacting with the field
-                        await page.wait_for_timeout(800)
-                        
-                        selector = selectors['new_membership'][selector_key]
-                        
-                        # Scroll to field and wait
-                        await page.locator(selector).scroll_into_view_if_needed()
-                        await page.wait_for_timeout(500)
-                        
-                        # Focus on the field first (human-like)
-                        await page.focus(selector)
-                        await page.wait_for_timeout(300)
-                        
-                        # Special handling for state field - convert abbreviations to full names
-                        field_value = str(member_data[field])
-                        if field == 'state':
-                            state_mapping = {
-                                'ACT': 'Australian Capital Territory',
-                                'A.C.T': 'Australian Capital Territory',
-                                'NSW': 'New South Wales',
-                                'N.S.W': 'New South Wales',
-                                'NT': 'Northern Territory',
-                                'N.T': 'Northern Territory',
-                                'QLD': 'Queensland',
-                                'SA': 'South Australia',
-                                'S.A': 'South Australia',
-                                'TAS': 'Tasmania',
-                                'VIC': 'Victoria',
-                                'WA': 'Western Australia',
-                                'W.A': 'Western Australia',
-                                'NZ': 'New Zealand'  # if needed
-                            }
-                            # Convert abbreviation to full name if found, otherwise use original
-                            field_value = state_mapping.get(field_value.strip(), field_value)
-                            print(f"   🗺️  State mapping: {member_data[field]} -> {field_value}")
-                        
-                        await page.select_option(selector, field_value)
-                        filled_fields.append(field)
-                        print(f"   ✅ Selected {field}: {field_value}")
-                        
-                        # Human-like pause after selection
-                        await page.wait_for_timeout(1200)
-                             
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to select {field}: {e}")
-                        # Brief pause even on error before continuing
-                        await page.wait_for_timeout(500)
-        
-        # Handle radio buttons for preExistingDamage (robust: radio -> label -> JS -> verify)
-        if 'preExistingDamage' in member_data:
+        # Handle possible duplicate rego modal only when rego is filled
+        if 'rego' in filled_fields:
+            rego_selector = new_membership['rego']
             try:
-                desired_yes = str(member_data['preExistingDamage']).strip().lower() in ('1', 'true', 'yes', 'y')
-                target_id = "yes" if desired_yes else "no"
-
-                # Prefer the specific visible container to avoid hidden duplicates
-                container = page.locator(".preExistingDamage1").first
-                await container.wait_for(state="visible", timeout=10000)
-
-                yes_radio = container.locator("input#yes[name='preExistingDamage'][value='1']").first
-                no_radio  = container.locator("input#no[name='preExistingDamage'][value='0']").first
-                target_radio = yes_radio if desired_yes else no_radio
-                other_radio  = no_radio if desired_yes else yes_radio
-                target_label = container.locator(f"label[for='{target_id}']").first
-
-                # Ensure in view
-                await target_radio.scroll_into_view_if_needed()
-
-                # Strategy 1: native set_checked
-                try:
-                    if not await target_radio.is_checked():
-                        await target_radio.set_checked(True, force=True)
-                except Exception:
-                    pass
-
-                # Strategy 2: click the label (often used for styled radios)
-                if not await target_radio.is_checked() and await target_label.count() > 0:
-                    await target_label.scroll_into_view_if_needed()
-                    await target_label.click(force=True)
-
-                # Strategy 3: JS set + dispatch events
-                if not await target_radio.is_checked():
-                    await page.evaluate(
-                        """(id) => {
-                            const el = document.getElementById(id);
-                            if (el) {
-                                el.checked = true;
-                                el.dispatchEvent(new Event('input', { bubbles: true }));
-                                el.dispatchEvent(new Event('change', { bubbles: true }));
-                                const form = el.form;
-                                if (form) {
-                                    form.dispatchEvent(new Event('input', { bubbles: true }));
-                                    form.dispatchEvent(new Event('change', { bubbles: true }));
-                                }
-                            }
-                        }""",
-                        target_id
-                    )
-
-                # Verify final state (and the opposite one is off)
-                is_checked = await target_radio.is_checked()
-                if not is_checked:
-                    # Fallback to configured selectors if present
-                    try:
-                        yes_sel = selectors['new_membership'].get('pre_existing_damage_yes')
-                        no_sel  = selectors['new_membership'].get('pre_existing_damage_no')
-                        if yes_sel and no_sel:
-                            await page.locator(yes_sel if desired_yes else no_sel).scroll_into_view_if_needed()
-                            await page.check(yes_sel if desired_yes else no_sel, force=True)
-                            is_checked = await page.is_checked(yes_sel if desired_yes else no_sel)
-                    except Exception:
-                        pass
-
-                if not is_checked:
-                    raise RuntimeError("Radio did not change state after all strategies")
-
-                # Optional: ensure other is unchecked
+                # Trigger any onChange/onBlur validation the site uses
+                await page.press(rego_selector, "Enter")
+            except Exception:
+                pass
+            try:
+                # Move focus away to ensure validation runs
+                await page.keyboard.press("Tab")
+            except Exception:
+                pass
+            # Only click OK if the modal actually appears
+            try:
+                handled = await dismiss_duplicate_rego_popup(page, timeout_ms=4000)
+                if handled:
+                    logger.info("   ℹ️ Duplicate rego detected and acknowledged")
+            except Exception as dup_e:
+                logger.warning(f"   ⚠️ Error handling duplicate rego popup: {dup_e}")
+        
+        # Handle select dropdowns - select_option auto-waits for the element and its option,
+        # which also covers dependent dropdowns whose options load after the previous selection
+        for field, selector in _SELECT_FIELDS:
+            if member_data.get(field):
                 try:
-                    if await other_radio.count() > 0 and await other_radio.is_checked():
-                        # If both are somehow checked (custom UI), uncheck the other via JS
-                        await page.evaluate(
-                            """(id) => {
-                                const el = document.getElementById(id);
-                                if (el) {
-                                    el.checked = false;
-                                    el.dispatchEvent(new Event('change', { bubbles: true }));
-                                }
-                            }""",
-                            "no" if desired_yes else "yes"
-                        )
-                except Exception:
-                    pass
-
-                print(f"   ✅ Selected Pre-existing Damage: {'Yes' if desired_yes else 'No'}")
+                    # Special handling for state field - convert abbreviations to full names
+                    field_value = str(member_data[field])
+                    if field == 'state':
+                        # Convert abbreviation to full name if found, otherwise use original
+                        field_value = STATE_NAMES.get(field_value.strip(), field_value)
+                        logger.debug("   🗺️  State mapping: %s -> %s", member_data[field], field_value)
+                    
+                    await page.select_option(selector, field_value)
+                    filled_fields.append(field)
+                         
+                except Exception as e:
+                    logger.warning(f"   ⚠️ Failed to select {field}: {e}")
+        
+        # Pre-existing damage radio and option checkboxes target independent inputs,
+        # so they are set concurrently - all checkboxes in a single page.evaluate
+        checkbox_fields = [
+            (field, selector)
+            for field, selector in _CHECKBOX_FIELDS
+            if is_truthy(member_data.get(field))
+        ]
+        
+        concurrent_actions = []
+        if 'preExistingDamage' in member_data:
+            concurrent_actions.append(set_pre_existing_damage(page, member_data['preExistingDamage']))
+        if checkbox_fields:
+            concurrent_actions.append(page.evaluate(JS_CHECK_FIELDS, [selector for _, selector in checkbox_fields]))
+        
+        results = await asyncio.gather(*concurrent_actions, return_exceptions=True)
+        
+        if 'preExistingDamage' in member_data:
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                logger.warning(f"   ⚠️ Failed to set pre-existing damage: {result}")
+            else:
+                logger.info(f"   ✅ Selected Pre-existing Damage: {'Yes' if result else 'No'}")
                 filled_fields.append('preExistingDamage')
-                if headless_mode:
-                    await page.wait_for_timeout(200)
-            except Exception as e:
-                print(f"   ⚠️ Failed to set pre-existing damage: {e}")
-
-        # Handle checkboxes
-        checkbox_fields = ['alloyWheels', 'paintProtection']
-        
-        for field in checkbox_fields:
-            if field in member_data and member_data[field]:
-                selector_key = FIELD_MAPPING.get(field)
-                if selector_key and selector_key in selectors['new_membership']:
-                    try:
-                        selector = selectors['new_membership'][selector_key]
-                        if str(member_data[field]).lower() in ['true', 'yes', '1']:
-                            await page.check(selector)
-                            print(f"   ✅ Checked {field}")
-                            filled_fields.append(field)
-                            
-                            # Add small delay in headless mode for stability
-                            if headless_mode:
-                                await page.wait_for_timeout(200)
-                                
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to check {field}: {e}")
-        
-        print(f"\n📊 Successfully filled {len(filled_fields)} fields")
+        
+        if checkbox_fields:
+            result = results.pop(0)
+            for field, selector in checkbox_fields:
+                if isinstance(result, Exception):
+                    logger.warning(f"   ⚠️ Failed to check {field}: {result}")
+                elif selector in result:
+                    filled_fields.append(field)
+                else:
+                    logger.warning(f"   ⚠️ Failed to check {field}: element {selector} not found")
+        
+        # One summary record for the whole fill phase; failures are still logged per field
+        logger.info(f"📊 Successfully filled {len(filled_fields)} fields: {', '.join(filled_fields)}")
         
         # STEP 4: SUBMIT FORM
-        print("\n🚀 Step 4: Submitting membership form...")
-        submit_selector = selectors['new_membership']['submit']
+        logger.info("🚀 Step 4: Submitting membership form...")
+        submit_selector = as_css(new_membership['submit'])
+        form_url = page.url
+        
+        # Capture the Add Member POST response - it may carry the new member ID directly
+        submit_response = asyncio.get_running_loop().create_future()
+        
+        def on_response(response):
+            if 'add-member' in response.url and response.request.method == 'POST' and not submit_response.done():
+                submit_response.set_result(response)
+        
+        page.on("response", on_response)
         
-        # Wait for submit button to be ready
+        # Held until the ID has been read, so concurrent runs can't pick up each other's member
+        await _submit_lock.acquire()
+        submit_locked = True
+        
+        # Try regular click first - it auto-waits for the button to be visible, enabled and
+        # stable, and scrolls it into view
         try:
-            await page.wait_for_selector(submit_selector, timeout=5000)
-            print("   ✅ Submit button found")
-            
-            # Scroll to submit button to ensure it's in view
-            submit_element = page.locator(submit_selector)
-            await submit_element.scroll_into_view_if_needed()
-            await page.wait_for_timeout(1000)
-            
-            # Try regular click first
-            await page.click(submit_selector)
-            print("   🎯 Clicked 'Add Member' button")
+            await page.locator(submit_selector).first.click(timeout=5000)
+            logger.info("   🎯 Clicked 'Add Member' button")
             
         except Exception as e:
-            print(f"   ⚠️ Regular click failed: {e}")
-            # Fallback to JavaScript click with proper escaping
+            logger.warning(f"   ⚠️ Regular click failed: {e}")
+            # Fallback to JavaScript click - the selector is passed as an argument, so no escaping
             try:
-                # Clean the selector for JavaScript
-                js_selector = submit_selector.replace("'", "\\'")
-                await page.evaluate(f"document.querySelector('{js_selector}').click()")
-                print("   🎯 Clicked 'Add Member' button (via JS)")
+                await page.evaluate(JS_CLICK, submit_selector)
+                logger.info("   🎯 Clicked 'Add Member' button (via JS)")
             except Exception as js_e:
-                print(f"   ❌ JavaScript click also failed: {js_e}")
+                logger.error(f"   ❌ JavaScript click also failed: {js_e}")
                 return None
         
-        # Wait for form submission with multiple strategies
-        print("   ⏳ Waiting for form submission...")
+        # Wait for whichever submission outcome shows up first: the POST response, leaving the
+        # form or validation messages
+        logger.debug("   ⏳ Waiting for form submission...")
+        url_changed = asyncio.create_task(
+            page.wait_for_url(lambda url: url != form_url, timeout=15000)
+        )
+        errors_shown = asyncio.create_task(
+            page.wait_for_selector(KENDO_VALIDATION_SELECTOR, timeout=15000)
+        )
+        page_outcomes = {url_changed, errors_shown}
+        done, pending = await asyncio.wait(page_outcomes | {submit_response}, return_when=asyncio.FIRST_COMPLETED)
         
-        # Strategy 1: Wait for navigation
-        try:
-            await page.wait_for_navigation(timeout=5000)
-            print("   ✅ Navigation detected")
-        except Exception as nav_error:
-            print(f"   ⚠️ No navigation detected: {nav_error}")
-            
-            # Strategy 2: Wait for URL change
-            current_url = page.url
-            try:
-                await page.wait_for_url(lambda url: url != current_url, timeout=5000)
-                print("   ✅ URL change detected")
-            except Exception as url_error:
-                print(f"   ⚠️ No URL change detected: {url_error}")
-                
-                # Strategy 3: Wait for any network activity or DOM change
-                try:
-                    await page.wait_for_timeout(5000)
-                    print("   ⏳ Waiting for any post-submission changes...")
-                except Exception as wait_error:
-                    print(f"   ⚠️ Wait error: {wait_error}")
+        # The POST response usually lands before the page reacts - when it carries the new
+        # member ID there is nothing left to wait for
+        response_checked = submit_response in done
+        if response_checked:
+            extracted_id = await member_id_from_response(submit_response)
+            if extracted_id:
+                for task in page_outcomes:
+                    task.cancel()
+                page.remove_listener("response", on_response)
+                logger.info(f"   ✅ EXTRACTED MEMBER ID (from submit response): '{extracted_id}'")
+                await save_extracted_id(extracted_id)
+                return extracted_id
+            if not page_outcomes & done:
+                done, pending = await asyncio.wait(page_outcomes, return_when=asyncio.FIRST_COMPLETED)
+        
+        for task in page_outcomes & pending:
+            task.cancel()
+        completed = [task for task in done if task in page_outcomes and task.exception() is None]
+        
+        if url_changed in completed:
+            logger.info("   ✅ URL change detected")
+        elif errors_shown in completed:
+            logger.warning("   ⚠️ Validation messages appeared")
+        else:
+            logger.warning("   ⚠️ No navigation or validation messages detected")
         
         # Check current state
         current_url = page.url
-        print(f"   🔗 Current URL: {current_url}")
+        logger.debug("   🔗 Current URL: %s", current_url)
         
         # VALIDATION ERROR CHECKING
         try:
@@ -481,167 +911,140 @@ async def create_schmick_membership(member_data):
             
             # Check if we're still on the add member form (indicates validation failure)
             if "/add-member" in current_url or "distributors" in current_url:
-                print("   ⚠️  Still on form page - checking for validation errors...")
-                
-                # Look for Kendo UI validation tooltips (primary method)
-                kendo_validation_selector = ".k-widget.k-tooltip.k-tooltip-validation.k-invalid-msg"
-                kendo_errors = page.locator(kendo_validation_selector)
-                kendo_count = await kendo_errors.count()
-                
-                if kendo_count > 0:
-                    print(f"   🔍 Found {kendo_count} Kendo validation errors")
-                    for i in range(kendo_count):
-                        error_element = kendo_errors.nth(i)
-                        error_text = await error_element.text_content()
-                        field_name = await error_element.get_attribute("data-for")
-                        
-                        if error_text and error_text.strip():
-                            field_info = f" (Field: {field_name})" if field_name else ""
-                            validation_errors.append(f"{error_text.strip()}{field_info}")
+                logger.warning("   ⚠️  Still on form page - checking for validation errors...")
                 
-                # Also check for other common validation error patterns as backup
-                backup_selectors = [
-                    ".error",
-                    ".field-error", 
-                    ".validation-error",
-                    ".alert-danger",
-                    ".text-danger",
-                    "[class*='error']",
-                    "[class*='invalid']",
-                    ".help-block.text-danger",
-                    ".invalid-feedback"
-                ]
+                # Scan every validation error source in a single page.evaluate round-trip
+                scan = await page.evaluate("() => window.__scanSchmickErrors()")
                 
-                for error_selector in backup_selectors:
-                    error_elements = page.locator(error_selector)
-                    error_count = await error_elements.count()
-                    
-                    if error_count > 0:
-                        for i in range(error_count):
-                            error_text = await error_elements.nth(i).text_content()
-                            if error_text and error_text.strip():
-                                validation_errors.append(f"General error: {error_text.strip()}")
-                
-                # Check for any red text or required field indicators
-                red_elements = page.locator("[style*='color: red'], [style*='color:red'], .text-red")
-                red_count = await red_elements.count()
+                # Kendo UI validation tooltips (primary method)
+                if scan["kendo"]:
+                    logger.info(f"   🔍 Found {len(scan['kendo'])} Kendo validation errors")
+                    for error in scan["kendo"]:
+                        if error["text"]:
+                            field_info = f" (Field: {error['field']})" if error["field"] else ""
+                            validation_errors.append(f"{error['text']}{field_info}")
                 
-                for i in range(red_count):
-                    red_text = await red_elements.nth(i).text_content()
-                    if red_text and red_text.strip() and "required" in red_text.lower():
-                        validation_errors.append(f"Required field error: {red_text.strip()}")
+                # Other common validation error patterns as backup (only scanned when Kendo found nothing)
+                for error_text in scan["backup"]:
+                    if error_text:
+                        validation_errors.append(f"General error: {error_text}")
                 
-                # Look for HTML5 validation messages
-                invalid_elements = page.locator(":invalid")
-                invalid_count = await invalid_elements.count()
+                # Red text or required field indicators
+                for red_text in scan["red"]:
+                    if red_text and "required" in red_text.lower():
+                        validation_errors.append(f"Required field error: {red_text}")
                 
+                # HTML5 validation messages
+                invalid_count = scan["invalid"]["count"]
                 if invalid_count > 0:
                     validation_errors.append(f"Found {invalid_count} invalid form fields")
-                    for i in range(min(invalid_count, 5)):  # Limit to first 5
-                        element = invalid_elements.nth(i)
-                        field_name = await element.get_attribute("name") or await element.get_attribute("id") or "unknown"
+                    for field_name in scan["invalid"]["fields"]:
                         validation_errors.append(f"Invalid field: {field_name}")
                 
                 if validation_errors:
-                    print("   ❌ VALIDATION ERRORS DETECTED:")
-                    for error in validation_errors:
-                        print(f"      - {error}")
+                    logger.error("\n".join(
+                        ["   ❌ VALIDATION ERRORS DETECTED:"]
+                        + [f"      - {error}" for error in validation_errors]
+                    ))
                     
                     # Log validation errors with user data
-                    log_validation_errors_with_user_data(validation_errors, current_url, member_data, request_id)
+                    await log_validation_errors_with_user_data(validation_errors, current_url, member_data, request_id)
                     
-                    print("   🛑 STOPPING: Form submission failed due to validation errors")
+                    logger.error("   🛑 STOPPING: Form submission failed due to validation errors")
                     return None
                 else:
-                    print("   ✅ No validation errors found on form page")
+                    logger.info("   ✅ No validation errors found on form page")
             else:
-                print("   ✅ Successfully navigated away from form page")
+                logger.info("   ✅ Successfully navigated away from form page")
         
         except Exception as e:
-            print(f"   ⚠️  Error while checking for validation: {str(e)}")
+            logger.warning(f"   ⚠️  Error while checking for validation: {str(e)}")
+        
+        logger.debug("   🔗 Final URL after validation check: %s", page.url)
+        
+        # Fast path: read the member ID from the submission response and skip the table lookup
+        extracted_id = None if response_checked else await member_id_from_response(submit_response)
+        page.remove_listener("response", on_response)
+        if extracted_id:
+            logger.info(f"   ✅ EXTRACTED MEMBER ID (from submit response): '{extracted_id}'")
+            await save_extracted_id(extracted_id)
+            return extracted_id
         
-        # Continue processing (wait a bit more for page to fully load)
-        await page.wait_for_timeout(8000)
-        print(f"   🔗 Final URL after validation check: {page.url}")
+        # Next fastest: ask the members JSON endpoint (when configured) instead of rendering the table
+        extracted_id = await member_id_from_api(context)
+        if extracted_id:
+            logger.info(f"   ✅ EXTRACTED MEMBER ID (from members API): '{extracted_id}'")
+            await save_extracted_id(extracted_id)
+            return extracted_id
         
         # STEP 5: NAVIGATE TO VIEW MEMBERS
-        print("\n📋 Step 5: Navigating to view members...")
+        logger.info("📋 Step 5: Navigating to view members...")
         view_members_url = selectors['result']['url']
         
         try:
-            await page.goto(view_members_url, wait_until='networkidle', timeout=10000)
-            print("   ✅ Navigated to view members page")
+            await page.goto(view_members_url, wait_until='domcontentloaded', timeout=10000)
+            logger.info("   ✅ Navigated to view members page")
         except Exception as e:
-            print(f"   ⚠️ Navigation to view members failed: {e}")
+            logger.warning(f"   ⚠️ Navigation to view members failed: {e}")
             # Try to continue anyway
         
         # STEP 6: EXTRACT MEMBER ID
-        print("\n🔍 Step 6: Extracting member ID from table...")
+        logger.info("🔍 Step 6: Extracting member ID from table...")
         
-        # Wait for table to load with multiple strategies
-        try:
-            await page.wait_for_selector(selectors['result']['table_container'], timeout=10000)
-            print("   ✅ Table container found")
-        except Exception as e:
-            print(f"   ⚠️ Table container not found: {e}")
-            # Try alternative selectors
-            try:
-                await page.wait_for_selector("table", timeout=15000)
-                print("   ✅ Found generic table")
-            except Exception as e2:
-                print(f"   ❌ No table found: {e2}")
-                return None
-        
-        # Extract ID from first column, first row
-        id_selector = selectors['result']['membership_selector']
+        # Extract ID from first column, first row - waiting on the cell also covers the table load
+        id_selector = as_css(selectors['result']['membership_selector'])
         
         try:
-            # Wait for the membership ID element to be present
             await page.wait_for_selector(id_selector, timeout=20000)
-            
-            id_elements = page.locator(id_selector)
-            element_count = await id_elements.count()
-            
-            if element_count > 0:
-                extracted_id = await id_elements.first.text_content()
-                if extracted_id and extracted_id.strip():
-                    extracted_id = extracted_id.strip()
-                    print(f"   ✅ EXTRACTED MEMBER ID: '{extracted_id}'")
-                    
-                    # Save to file for reference
-                    try:
-                        with open("extracted_id.txt", "w") as f:
-                            f.write(extracted_id)
-                        print(f"   💾 ID saved to 'extracted_id.txt'")
-                    except Exception as file_error:
-                        print(f"   ⚠️ Could not save to file: {file_error}")
-                    
-                    return extracted_id
-                else:
-                    print("   ❌ Member ID element found but content is empty")
-            else:
-                print("   ❌ No member ID elements found in table")
+            extracted_id = (await page.locator(id_selector).first.text_content() or "").strip()
+        except PlaywrightTimeoutError:
+            logger.error("   ❌ No member ID elements found in table")
             return None
-            
         except Exception as e:
-            print(f"   ❌ Error extracting ID: {e}")
+            logger.error(f"   ❌ Error extracting ID: {e}")
+            return None
+        
+        if not extracted_id:
+            logger.error("   ❌ Member ID element found but content is empty")
             return None
+        
+        logger.info(f"   ✅ EXTRACTED MEMBER ID: '{extracted_id}'")
+        await save_extracted_id(extracted_id)
+        return extracted_id
             
     except Exception as e:
-        print(f"❌ General error during process: {e}")
+        logger.error(f"❌ General error during process: {e}")
         return None
         
     finally:
-        # Clean up
+        if submit_locked:
+            _submit_lock.release()
+        
+        # Clean up - only the per-request context, the shared browser stays up
         try:
             if context:
                 await context.close()
-            if browser:
-                await browser.close()
-            if playwright:
-                await playwright.stop()
         except Exception as cleanup_error:
-            print(f"⚠️ Cleanup error: {cleanup_error}")
+            logger.warning(f"⚠️ Cleanup error: {cleanup_error}")
+
+
+async def create_batch(members, max_concurrency=None):
+    """
+    Create several memberships concurrently, each in its own context on the shared browser.
+    At most max_concurrency (default MAX_CONCURRENCY, 2) run at once. Login and form filling
+    overlap; submitting and reading back the member ID run one member at a time (_submit_lock),
+    since the ID fallbacks take the newest member. Returns one result per member in input
+    order - the member ID, None, or the exception that member raised.
+    """
+    if max_concurrency is None:
+        max_concurrency = load_env().MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def create_one(member_data):
+        async with semaphore:
+            return await create_schmick_membership(member_data)
+    
+    return await asyncio.gather(*(create_one(member_data) for member_data in members), return_exceptions=True)
 
 
 async def main():
@@ -682,7 +1085,11 @@ async def main():
     print("📋 Using test data - this will be replaced by JSON from n8n")
     print()
     
-    extracted_id = await create_schmick_membership(test_member)
+    try:
+        extracted_id = await create_schmick_membership(test_member)
+    finally:
+        await close_browser()
+        await flush_logs()
     
     if extracted_id:
         print(f"\n🎯 FINAL RESULT: Member ID = '{extracted_id}'")
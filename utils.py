@@ -4,14 +4,33 @@ Includes environment loading, data formatting, retry logic, and storage state he
 """
 
 import asyncio
+import hashlib
 import json
 import os
-from pathlib import Path
-from typing import Any, Dict, Optional, Union
+import random
+import re
+import tempfile
+from typing import Any, Dict, NamedTuple, Optional, Union
 from functools import wraps
+from uuid import uuid4
 
 from dotenv import load_dotenv
 
+# Storage state is serialised in one shot and parsed from a single read of the whole file,
+# with orjson when available, else stdlib json
+try:
+    import orjson
+    
+    def _dumps_state(storage_state: Dict[str, Any]) -> bytes:
+        return orjson.dumps(storage_state, option=orjson.OPT_INDENT_2)
+    
+    _loads_state = orjson.loads
+except ImportError:
+    def _dumps_state(storage_state: Dict[str, Any]) -> bytes:
+        return json.dumps(storage_state, indent=2).encode()
+    
+    _loads_state = json.loads
+
 
 class RetryableError(Exception):
     """Base class for errors that should trigger retries."""
@@ -23,27 +42,87 @@ class NonRetryableError(Exception):
     pass
 
 
-def load_env() -> Dict[str, str]:
+# Values accepted as "yes" for booleans coming from n8n JSON or environment variables
+_TRUTHY = frozenset({"1", "true", "yes", "y", "on"})
+
+
+def is_truthy(value: Any) -> bool:
+    """True for True/1 and for strings like 'true', 'Yes' or ' on '"""
+    return value is True or str(value).strip().lower() in _TRUTHY
+
+
+def _int_env(name: str, default: int) -> int:
+    """Integer environment variable, or default when it is unset, empty or not a number"""
+    try:
+        return int(os.getenv(name, ''))
+    except ValueError:
+        return default
+
+
+class Config(NamedTuple):
+    """Service configuration read from the environment (immutable, attribute access)."""
+    PLAYWRIGHT_API_KEY: str
+    SCHMICK_USER: str
+    SCHMICK_PASS: str
+    HEADLESS: bool
+    BROWSER: str
+    PW_SLOW_MO: int
+    PORT: int
+    STORAGE_STATE_FILE: str
+    MAX_CONCURRENCY: int
+    TIMEOUT_MS: int
+    AUTH_STATE_TTL: int
+
+
+# Parsed configuration, filled on the first load_env() call
+_config: Optional[Config] = None
+
+
+def load_env() -> Config:
     """
     Load environment variables from .env file and return configuration.
     
+    The .env file is parsed once; later calls return the cached configuration.
+    Use reload_env() to pick up changes to the environment.
+    
     Returns:
-        Dictionary of configuration values with appropriate defaults
+        Config with the configuration values and appropriate defaults
     """
+    global _config
+    
+    if _config is not None:
+        return _config
+    
     load_dotenv()
     
-    config = {
-        'PLAYWRIGHT_API_KEY': os.getenv('PLAYWRIGHT_API_KEY', ''),
-        'SCHMICK_USER': os.getenv('SCHMICK_USER', ''),
-        'SCHMICK_PASS': os.getenv('SCHMICK_PASS', ''),
-        'HEADLESS': os.getenv('HEADLESS', 'true').lower() == 'true',
-        'PORT': int(os.getenv('PORT', '8000')),
-        'STORAGE_STATE_FILE': os.getenv('STORAGE_STATE_FILE', 'state.json'),
-        'MAX_CONCURRENCY': int(os.getenv('MAX_CONCURRENCY', '2')),
-        'TIMEOUT_MS': int(os.getenv('TIMEOUT_MS', '30000')),
-    }
+    # Immutable, since every caller shares the same cached configuration
+    _config = Config(
+        PLAYWRIGHT_API_KEY=os.getenv('PLAYWRIGHT_API_KEY', ''),
+        SCHMICK_USER=os.getenv('SCHMICK_USER', ''),
+        SCHMICK_PASS=os.getenv('SCHMICK_PASS', ''),
+        HEADLESS=is_truthy(os.getenv('HEADLESS', 'true')),
+        BROWSER=os.getenv('BROWSER', 'chromium').strip().lower(),
+        PW_SLOW_MO=_int_env('PW_SLOW_MO', 0),
+        PORT=int(os.getenv('PORT', '8000')),
+        STORAGE_STATE_FILE=os.getenv('STORAGE_STATE_FILE', 'state.json'),
+        MAX_CONCURRENCY=int(os.getenv('MAX_CONCURRENCY', '2')),
+        TIMEOUT_MS=int(os.getenv('TIMEOUT_MS', '30000')),
+        AUTH_STATE_TTL=_int_env('AUTH_STATE_TTL', 3600),
+    )
+    return _config
+
+
+def reload_env() -> Config:
+    """
+    Discard the cached configuration and load it again from the environment.
     
-    return config
+    Returns:
+        Config with the configuration values and appropriate defaults
+    """
+    global _config
+    
+    _config = None
+    return load_env()
 
 
 def validate_required_env() -> None:
@@ -56,12 +135,19 @@ def validate_required_env() -> None:
     config = load_env()
     required_vars = ['PLAYWRIGHT_API_KEY', 'SCHMICK_USER', 'SCHMICK_PASS']
     
-    missing_vars = [var for var in required_vars if not config[var]]
+    missing_vars = [var for var in required_vars if not getattr(config, var)]
     
     if missing_vars:
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
 
+# Label prefixes stripped from scraped membership numbers (case-insensitive, repeated)
+_MEMBERSHIP_PREFIX_RE = re.compile(
+    r'^(?:(?:membership number|membership|number|member id|id|confirmation|reference):\s*)+',
+    re.IGNORECASE
+)
+
+
 def format_membership_number(raw_membership: str) -> str:
     """
     Format and sanitize the membership number extracted from the web page.
@@ -75,18 +161,14 @@ def format_membership_number(raw_membership: str) -> str:
     if not raw_membership:
         return ""
     
-    # Remove common prefixes, whitespace, and normalize
     membership = raw_membership.strip()
     
-    # Remove common prefixes like "Membership Number:", "ID:", etc.
-    prefixes_to_remove = [
-        "membership number:", "membership:", "number:", "id:", 
-        "member id:", "confirmation:", "reference:"
-    ]
+    # Already clean (the usual case): every prefix ends in a colon, so there is nothing to strip
+    if ':' not in membership and not membership.startswith('-'):
+        return membership
     
-    for prefix in prefixes_to_remove:
-        if membership.lower().startswith(prefix):
-            membership = membership[len(prefix):].strip()
+    # Remove common prefixes like "Membership Number:", "ID:", etc.
+    membership = _MEMBERSHIP_PREFIX_RE.sub("", membership)
     
     # Remove any remaining colons or dashes at the start
     membership = membership.lstrip(":-").strip()
@@ -94,6 +176,10 @@ def format_membership_number(raw_membership: str) -> str:
     return membership
 
 
+# Record fields that are always masked before logging
+_SENSITIVE_FIELDS = frozenset({'ssn', 'social_security', 'credit_card', 'password'})
+
+
 def sanitize_record_data(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Sanitize record data for safe logging (remove/mask sensitive fields).
@@ -102,24 +188,27 @@ def sanitize_record_data(record: Dict[str, Any]) -> Dict[str, Any]:
         record: The record data dictionary
         
     Returns:
-        Sanitized dictionary safe for logging
+        Sanitized dictionary safe for logging (the record itself when nothing needs masking)
     """
+    sensitive_present = _SENSITIVE_FIELDS & record.keys()
+    
+    # Split the email once - sep is empty when there is no '@' to mask around
+    local, sep, domain = (record.get('email') or '').partition('@')
+    mask_email = bool(sep) and len(local) > 2
+    
+    # Common case - nothing to mask, so skip the copy
+    if not sensitive_present and not mask_email:
+        return record
+    
     safe_record = record.copy()
     
     # Remove or mask potentially sensitive fields
-    sensitive_fields = ['ssn', 'social_security', 'credit_card', 'password']
-    
-    for field in sensitive_fields:
-        if field in safe_record:
-            safe_record[field] = "***MASKED***"
+    for field in sensitive_present:
+        safe_record[field] = "***MASKED***"
     
     # Partially mask email for privacy
-    if 'email' in safe_record and safe_record['email']:
-        email = safe_record['email']
-        if '@' in email:
-            local, domain = email.split('@', 1)
-            if len(local) > 2:
-                safe_record['email'] = f"{local[:2]}***@{domain}"
+    if mask_email:
+        safe_record['email'] = f"{local[:2]}***@{domain}"
     
     return safe_record
 
@@ -129,17 +218,25 @@ async def retry_async(
     max_retries: int = 3, 
     base_delay: float = 1.0, 
     backoff_factor: float = 2.0,
-    retryable_exceptions: tuple = (RetryableError,)
+    retryable_exceptions: tuple = (RetryableError,),
+    max_delay: float = 60.0,
+    jitter: bool = True
 ):
     """
     Retry an async function with exponential backoff.
     
+    The backoff delay is capped at max_delay. With jitter enabled ("full jitter")
+    each sleep is a random duration between 0 and the capped delay, so concurrent
+    callers retrying the same failure don't all wake up at once.
+    
     Args:
         func: Async function to retry
         max_retries: Maximum number of retry attempts
         base_delay: Initial delay between retries in seconds
         backoff_factor: Factor to multiply delay by on each retry
         retryable_exceptions: Tuple of exception types that should trigger retries
+        max_delay: Upper bound for the delay between retries in seconds
+        jitter: Sleep a random duration up to the delay instead of the full delay
         
     Returns:
         Result of successful function execution
@@ -148,6 +245,7 @@ async def retry_async(
         The last exception if all retries fail
     """
     last_exception = None
+    delay = base_delay
     
     for attempt in range(max_retries + 1):  # +1 for initial attempt
         try:
@@ -157,11 +255,10 @@ async def retry_async(
             if attempt >= max_retries:
                 break
             
-            delay = base_delay * (backoff_factor ** attempt)
-            await asyncio.sleep(delay)
-        except Exception as e:
-            # Non-retryable exceptions are raised immediately
-            raise e
+            capped_delay = min(delay, max_delay)
+            await asyncio.sleep(random.uniform(0, capped_delay) if jitter else capped_delay)
+            delay *= backoff_factor
+        # Any other exception is non-retryable and propagates from func() as-is
     
     # If we get here, all retries failed
     raise last_exception
@@ -170,12 +267,32 @@ async def retry_async(
 class StorageStateManager:
     """Manager for Playwright storage state persistence."""
     
-    def __init__(self, storage_file: str = "state.json"):
-        self.storage_file = Path(storage_file)
+    def __init__(self, storage_file: Union[str, os.PathLike] = "state.json"):
+        # Plain string paths - the os/open calls below take them directly without pathlib overhead
+        self.storage_file = os.fspath(storage_file)
+        self._parent = os.path.dirname(self.storage_file) or '.'
+        self._tmp_prefix = os.path.basename(self.storage_file) + '.'
+        # Last known existence of the file; kept up to date by save()/delete()
+        self._exists_cache: Optional[bool] = None
     
     def exists(self) -> bool:
-        """Check if storage state file exists."""
-        return self.storage_file.exists()
+        """Check if storage state file exists (cached until save/delete/invalidate)."""
+        if self._exists_cache is None:
+            self._exists_cache = os.path.exists(self.storage_file)
+        return self._exists_cache
+    
+    def invalidate(self) -> None:
+        """Forget the cached exists() result, e.g. after the file was changed by another process."""
+        self._exists_cache = None
+    
+    async def load_async(self) -> Optional[Dict[str, Any]]:
+        """
+        Load storage state from file in a worker thread, without blocking the event loop.
+        
+        Returns:
+            Storage state dictionary or None if file doesn't exist/invalid
+        """
+        return await asyncio.to_thread(self.load)
     
     def load(self) -> Optional[Dict[str, Any]]:
         """
@@ -184,18 +301,16 @@ class StorageStateManager:
         Returns:
             Storage state dictionary or None if file doesn't exist/invalid
         """
-        if not self.exists():
-            return None
-        
         try:
-            with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            with open(self.storage_file, 'rb') as f:
+                return _loads_state(f.read())
+        except (ValueError, OSError):
+            # Missing file (FileNotFoundError) or invalid JSON (both decoders raise ValueError subclasses)
             return None
     
     async def save(self, storage_state: Dict[str, Any]) -> bool:
         """
-        Save storage state to file.
+        Save storage state to file in a worker thread, without blocking the event loop.
         
         Args:
             storage_state: Storage state dictionary from Playwright context
@@ -203,14 +318,32 @@ class StorageStateManager:
         Returns:
             True if saved successfully, False otherwise
         """
+        return await asyncio.to_thread(self._save_sync, storage_state)
+    
+    def _save_sync(self, storage_state: Dict[str, Any]) -> bool:
+        """Blocking implementation of save()."""
+        tmp_file = None
         try:
+            data = _dumps_state(storage_state)
+            
             # Ensure directory exists
-            self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+            os.makedirs(self._parent, exist_ok=True)
             
-            with open(self.storage_file, 'w') as f:
-                json.dump(storage_state, f, indent=2)
+            # Write the whole buffer to a temp file unique to this writer and atomically swap it in,
+            # so neither an interrupted write nor a concurrent save can leave a corrupt state file behind
+            fd, tmp_file = tempfile.mkstemp(dir=self._parent, prefix=self._tmp_prefix, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.storage_file)
+            self._exists_cache = True
             return True
-        except IOError:
+        except (OSError, TypeError):
+            if tmp_file is not None:
+                try:
+                    os.unlink(tmp_file)
+                except OSError:
+                    pass
+            self.invalidate()
             return False
     
     def delete(self) -> bool:
@@ -221,11 +354,26 @@ class StorageStateManager:
             True if deleted successfully, False otherwise
         """
         try:
-            if self.exists():
-                self.storage_file.unlink()
-            return True
-        except IOError:
+            os.unlink(self.storage_file)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            self.invalidate()
             return False
+        self._exists_cache = False
+        return True
+
+
+def auth_state_file(username: str, password: str, auth_state_dir: str = ".auth") -> str:
+    """
+    Path of the saved login session for a username/password pair.
+    
+    The file name is a hash of both credentials, so a session is only reused by
+    callers presenting the password that created it, and different users never
+    share a file.
+    """
+    key = hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()
+    return os.path.join(auth_state_dir, f"{key}.json")
 
 
 def create_request_context(**kwargs) -> Dict[str, Any]:
@@ -236,12 +384,10 @@ def create_request_context(**kwargs) -> Dict[str, Any]:
         **kwargs: Additional context fields
         
     Returns:
-        Context dictionary with request_id and other fields
+        Context dictionary with request_id (32 hex chars) and other fields
     """
-    import uuid
-    
     context = {
-        'request_id': str(uuid.uuid4()),
+        'request_id': uuid4().hex,
         **kwargs
     }
     
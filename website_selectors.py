@@ -3,29 +3,39 @@ CSS/XPath selectors for the Schmick Club web application.
 Real Schmick website: app.schmickclub.com
 """
 
+import sys
+from functools import lru_cache
+
 # Schmick Club website selectors - REAL WEBSITE
 # Workflow:
 # 1. Login at https://app.schmickclub.com/login
 # 2. Fill form at https://app.schmickclub.com/memberships/distributors/add-member
 # 3. Get ID from table at https://app.schmickclub.com/memberships/distributors/view-members
 
+# Shared by several pages/sections below - defined once so every entry refers to the same value
+BASE_URL = "https://app.schmickclub.com/memberships/distributors"
+ERROR_INDICATOR = (".alert-danger", ".error", ".alert-error", ".text-danger")
+TABLE_SELECTOR = ("table", ".table", ".members-table", ".data-table")
+
+# Entries with fallbacks are tuples of individual selectors; pass them through as_css()
+# to get the comma-joined form Playwright matches in a single query
 selectors = {
     # Login page selectors for Schmick Club
     "login": {
-        "url": "https://app.schmickclub.com/memberships/distributors",
-        "username": "#username, input[name='username'], input.form-control[type='text']",
-        "password": "#password, input[name='password'], input.form-control[type='password']", 
-        "submit": "#loginButton, button[type='button'].test, button:has-text('Login')",
-        "post_login_indicator": "body, .dashboard, .user-menu, .container",
+        "url": BASE_URL,
+        "username": ("#username", "input[name='username']", "input.form-control[type='text']"),
+        "password": ("#password", "input[name='password']", "input.form-control[type='password']"),
+        "submit": ("#loginButton", "button[type='button'].test", "button:has-text('Login')"),
+        "post_login_indicator": ("body", ".dashboard", ".user-menu", ".container"),
         # Error indicators
-        "error_indicator": ".alert-danger, .error, .alert-error, .text-danger",
-        "captcha_indicator": ".captcha, #captcha, [class*='captcha'], .recaptcha",
-        "two_fa_indicator": ".two-factor, [class*='two-factor'], .mfa",
+        "error_indicator": ERROR_INDICATOR,
+        "captcha_indicator": (".captcha", "#captcha", "[class*='captcha']", ".recaptcha"),
+        "two_fa_indicator": (".two-factor", "[class*='two-factor']", ".mfa"),
     },
     
     # Add member form selectors for Schmick Club
     "new_membership": {
-        "url": "https://app.schmickclub.com/memberships/distributors/add-member",
+        "url": f"{BASE_URL}/add-member",
         # Personal Information
         "business_name": "#businessName",
         "first_name": "#firstName", 
@@ -65,38 +75,63 @@ selectors = {
         "retail_fee": "#retailFee",
         
         # Form submission
-        "submit": "button[type='submit'], input[type='submit'], .btn-primary, #addMember",
-        "form_container": "#businessName, #firstName, form, .form-container, .add-member-form",
+        "submit": ("button[type='submit']", "input[type='submit']", ".btn-primary", "#addMember"),
+        "form_container": ("#businessName", "#firstName", "form", ".form-container", ".add-member-form"),
     },
     
     # Results page selectors - view members table
     "result": {
-        "url": "https://app.schmickclub.com/memberships/distributors/view-members",
+        "url": f"{BASE_URL}/view-members",
         # Get ID from first column, first row of table
-        "membership_selector": "table tr:first-child td:first-child, table tbody tr:first-child td:first-child, .table tr:first-child td:first-child, .members-table tr:first-child td:first-child",
-        "success_indicator": "table, .table, .members-table, .data-table",
-        "error_indicator": ".alert-danger, .error, .alert-error, .text-danger",
-        "loading_indicator": ".loading, .spinner, .processing, .loader",
-        "table_container": "table, .table, .members-table, .data-table",
+        "membership_selector": (
+            "table tr:first-child td:first-child",
+            "table tbody tr:first-child td:first-child",
+            ".table tr:first-child td:first-child",
+            ".members-table tr:first-child td:first-child",
+        ),
+        "success_indicator": TABLE_SELECTOR,
+        "error_indicator": ERROR_INDICATOR,
+        "loading_indicator": (".loading", ".spinner", ".processing", ".loader"),
+        "table_container": TABLE_SELECTOR,
     },
     
     # Common navigation
     "navigation": {
-        "home": "a[href='/'], .navbar-brand, .logo",
-        "logout": "a[href*='logout'], button[class*='logout'], .logout",
+        "home": ("a[href='/']", ".navbar-brand", ".logo"),
+        "logout": ("a[href*='logout']", "button[class*='logout']", ".logout"),
         "view_members": "a[href*='view-members']",
         "add_member": "a[href*='add-member']",
     },
     
     # Wait indicators
     "wait_for": {
-        "page_loaded": "body, .container, main, .content",
-        "form_ready": "form, #addMember, .form-container",
-        "table_ready": "table, .table, .members-table",
+        "page_loaded": ("body", ".container", "main", ".content"),
+        "form_ready": ("form", "#addMember", ".form-container"),
+        "table_ready": ("table", ".table", ".members-table"),
         "ajax_complete": ":not(.loading)",
     }
 }
 
+
+def _dedupe_selectors(value):
+    """Fallback tuple with selectors stripped and repeats dropped, keeping the first occurrence"""
+    return tuple(dict.fromkeys(part.strip() for part in value if part.strip()))
+
+
+# Dedupe every fallback tuple once at import
+for _section in selectors.values():
+    for _key, _value in _section.items():
+        if isinstance(_value, tuple):
+            _section[_key] = _dedupe_selectors(_value)
+del _section, _key, _value
+
+
+@lru_cache(maxsize=None)
+def as_css(value):
+    """Comma-joined CSS for a selector entry (tuple of fallbacks or a single selector string)"""
+    return value if isinstance(value, str) else ", ".join(value)
+
+
 # Field mapping for dynamic form filling
 # Maps record field names to selector keys for Schmick Club
 FIELD_MAPPING = {
@@ -155,4 +190,30 @@ DROPDOWN_VALUES = {
         "VT": "Vermont", "VA": "Virginia", "WA": "Washington", "WV": "West Virginia",
         "WI": "Wisconsin", "WY": "Wyoming"
     }
-}
\ No newline at end of file
+}
+
+
+def _intern_all(value):
+    """Copy of a nested dict/tuple structure with every string key and value interned"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(k): _intern_all(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_intern_all(v) for v in value)
+    return value
+
+
+# Intern the keys and selector strings looked up on every request, so dict lookups
+# hit the identity fast path
+selectors = _intern_all(selectors)
+FIELD_MAPPING = _intern_all(FIELD_MAPPING)
+TIMEOUTS = _intern_all(TIMEOUTS)
+DROPDOWN_VALUES = _intern_all(DROPDOWN_VALUES)
+
+# (record field, Add Member form selector) for every mapped field the form has a selector for
+FIELD_SELECTORS = tuple(
+    (record_key, selectors["new_membership"][sel_key])
+    for record_key, sel_key in FIELD_MAPPING.items()
+    if selectors["new_membership"].get(sel_key)
+)